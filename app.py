@@ -2,14 +2,65 @@
 Flask Application
 """
 
+import hashlib
+import mimetypes
+import os
 from dataclasses import fields
-from flask import Flask, jsonify, request
-from models import Experience, Education, Skill
-from utils import validate_data
+from urllib.parse import urlencode
+from flask import (
+    Flask,
+    jsonify,
+    redirect,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from cache import ResponseCache
+from compression import PREFERENCE, choose_encoding, compress
+from dates import DATE_FIELDS, UNKNOWN, DateIndex, date_key
+from json_provider import ResumeJSONProvider, projection_encoder
+from logos import LOGO_EXTENSIONS, LogoStore, LogoTooLarge
+from metrics import Metrics, instrument
+from models import MODELS, Experience, Education, Skill
+from profiling import RequestProfiler, StackSampler, profile_requests
+from render import FORMATS, DocumentRenderer
+from search import SearchIndex
+from storage import create_storage
+from utils import (
+    decode_cursor,
+    decode_sort_cursor,
+    encode_cursor,
+    encode_sort_cursor,
+    validate_record,
+)
 
 app = Flask(__name__)
+app.json = ResumeJSONProvider(app)
+app.config["RESUME_STORAGE"] = os.environ.get("RESUME_STORAGE", "memory")
+app.config["DEFAULT_PAGE_LIMIT"] = 100
+app.config["MAX_PAGE_LIMIT"] = 1000
+app.config["RESPONSE_CACHE_MAX_BYTES"] = 16 * 1024 * 1024
+app.config["BULK_BATCH_SIZE"] = 500
+app.config["STREAM_CHUNK_SIZE"] = 100
+app.config["COMPRESS_MIN_SIZE"] = 1024
+app.config["LOGO_STORE_DIR"] = os.environ.get(
+    "LOGO_STORE_DIR", os.path.join(app.instance_path, "logos")
+)
+app.config["LOGO_SOURCE_DIR"] = app.root_path
+app.config["LOGO_MAX_AGE"] = 365 * 24 * 60 * 60
+app.config["LOGO_MAX_SIZE"] = 2 * 1024 * 1024
+app.config["LOGO_GC_INTERVAL"] = 60 * 60
+app.config["LOGO_GC_GRACE"] = 60 * 60
+app.config["METRICS_ENABLED"] = os.environ.get("RESUME_METRICS", "1") != "0"
+app.config["PROFILING_ENABLED"] = os.environ.get("RESUME_PROFILING") == "1"
+app.config["PROFILE_HEADER"] = "X-Profile"
+app.config["PROFILE_KEEP"] = 20
+app.config["PROFILE_DIR"] = os.environ.get("RESUME_PROFILE_DIR")
+app.config["SAMPLING_INTERVAL"] = float(os.environ.get("RESUME_SAMPLING_INTERVAL", 0))
 
-data = {
+store = create_storage(app.config["RESUME_STORAGE"])
+store.seed({
     "experience": [
         Experience(
             "Software Developer",
@@ -31,9 +82,536 @@ data = {
         )
     ],
     "skill": [Skill("Python", "1-2 Years", "example-logo.png")],
+})
+
+response_cache = ResponseCache(app.config["RESPONSE_CACHE_MAX_BYTES"])
+
+
+def invalidate_responses(section, item_id, item):
+    """
+    Drops the cached responses a write makes stale, including the
+    aggregated ``/resume`` document.
+    """
+    response_cache.invalidate(section, item_id)
+    response_cache.invalidate("resume")
+
+
+store.subscribe(invalidate_responses)
+
+search_index = SearchIndex()
+search_index.follow(store)
+
+date_index = DateIndex()
+date_index.follow(store)
+
+renderer = DocumentRenderer()
+renderer.follow(store)
+
+logo_store = LogoStore(app.config["LOGO_STORE_DIR"])
+logo_store.import_directory(app.config["LOGO_SOURCE_DIR"])
+
+
+def referenced_logos():
+    """
+    Returns the digests of every logo referenced by a record.
+    """
+    digests = set()
+    for section in MODELS:
+        for _, item in store.snapshot(section):
+            digest = logo_store.digest_of(item.logo)
+            if digest is not None:
+                digests.add(digest)
+    return digests
+
+
+if app.config["LOGO_GC_INTERVAL"]:
+    logo_store.start_collector(
+        referenced_logos,
+        app.config["LOGO_GC_INTERVAL"],
+        app.config["LOGO_GC_GRACE"],
+    )
+
+
+def cache_hit_ratio(stats):
+    """
+    Returns the share of response cache lookups that were hits.
+    """
+    lookups = stats["hits"] + stats["misses"]
+    return stats["hits"] / lookups if lookups else 0.0
+
+
+metrics = Metrics()
+instrument(app, metrics)
+metrics.gauge(
+    "records",
+    "Records stored per section.",
+    lambda: [((section,), store.count(section)) for section in MODELS],
+    labels=("section",),
+)
+for stat in ("hits", "misses", "evictions"):
+    metrics.gauge(
+        f"response_cache_{stat}_total",
+        f"Response cache {stat}.",
+        lambda stat=stat: response_cache.stats()[stat],
+        kind="counter",
+    )
+metrics.gauge(
+    "response_cache_entries",
+    "Responses held in the response cache.",
+    lambda: response_cache.stats()["entries"],
+)
+metrics.gauge(
+    "response_cache_bytes",
+    "Bytes held in the response cache.",
+    lambda: response_cache.stats()["bytes"],
+)
+metrics.gauge(
+    "response_cache_hit_ratio",
+    "Share of response cache lookups that were hits.",
+    lambda: cache_hit_ratio(response_cache.stats()),
+)
+
+profiler = RequestProfiler(app.config["PROFILE_KEEP"], app.config["PROFILE_DIR"])
+profile_requests(app, profiler)
+sampler = StackSampler(app.config["SAMPLING_INTERVAL"] or 0.01)
+if app.config["SAMPLING_INTERVAL"]:
+    sampler.start()
+
+
+def resource_etag(section, item_id=None, query=None):
+    """
+    Builds a strong ETag for a section or a single record, as requested.
+
+    The tag is derived from the store's version counters and the query
+    string, so it changes on every write and differs between pages.
+
+    Parameters
+    ----------
+    section : str
+        The section the resource belongs to.
+    item_id : int, optional
+        The ID of a single record.
+    query : bytes, optional
+        The query string; defaults to the one of the current request.
+
+    Returns
+    -------
+    str or None
+        The ETag, or None if the record does not exist.
+    """
+    version = store.version(section, item_id)
+    if version is None:
+        return None
+    if query is None:
+        query = request.query_string
+    key = f"{store.epoch}:{section}:{item_id}:{version}:{query!r}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def resume_etag():
+    """
+    Builds a strong ETag for the whole resume from the ETags of its
+    sections, so it changes whenever any section does.
+    """
+    key = ":".join(resource_etag(section, query=b"") for section in MODELS)
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def matched_etag(etag):
+    """
+    Returns the If-None-Match tag that matches ``etag`` in any content
+    coding, or None. Compressed responses carry ``etag`` with a ``-gzip``
+    or ``-br`` suffix.
+    """
+    for tag in (etag, *(f"{etag}-{encoding}" for encoding in PREFERENCE)):
+        if tag in request.if_none_match:
+            return tag
+    return None
+
+
+def not_modified(etag):
+    """
+    Returns an empty 304 response carrying ``etag``.
+    """
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def cached_response(key, etag, build, encoded=False):
+    """
+    Returns a JSON response from the response cache, building it on a miss.
+
+    If the client accepts gzip (or brotli, when installed) and the body is
+    at least ``COMPRESS_MIN_SIZE`` bytes, the compressed body is sent and
+    cached next to the plain one, so unchanged data is compressed once.
+
+    Parameters
+    ----------
+    key : tuple
+        ``(section, item_id, variant)`` cache key.
+    etag : str
+        The ETag of the current representation.
+    build : callable
+        Returns ``(data, headers)``: the object to encode and any extra
+        response headers. Called only on a cache miss.
+    encoded : bool
+        Whether ``build`` returns the JSON body as bytes rather than an
+        object to encode.
+
+    Returns
+    -------
+    Response
+        The JSON response, with ETag and X-Cache (HIT or MISS) headers.
+    """
+    cached = response_cache.get(key, etag)
+    if cached is None:
+        data, headers = build()
+        body = data if encoded else jsonify(data).get_data()
+        response_cache.put(key, etag, body, headers)
+        status = "MISS"
+    else:
+        body, headers = cached
+        status = "HIT"
+
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is not None and len(body) >= app.config["COMPRESS_MIN_SIZE"]:
+        # Compressed entries share the (section, item_id) prefix, so writes
+        # invalidate them together with the plain body.
+        compressed_key = key + (encoding,)
+        compressed = response_cache.get(compressed_key, etag, track=False)
+        if compressed is None:
+            body = compress(body, encoding)
+            response_cache.put(compressed_key, etag, body, headers)
+        else:
+            body = compressed[0]
+    else:
+        encoding = None
+
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    response.headers.update(headers)
+    response.headers["X-Cache"] = status
+    response.vary.add("Accept-Encoding")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+        etag = f"{etag}-{encoding}"
+    response.set_etag(etag)
+    return response
+
+
+def section_fragment(section):
+    """
+    Returns the encoded JSON list of every record of a section.
+
+    The fragment is the cached body of a plain ``GET /resume/<section>``,
+    so the two share one cache entry, and a write re-encodes only the
+    section it changed.
+    """
+    key = (section, None, b"")
+    etag = resource_etag(section, query=b"")
+    cached = response_cache.get(key, etag)
+    if cached is not None:
+        return cached[0]
+    body = jsonify(store.all(section)).get_data()
+    response_cache.put(key, etag, body, {})
+    return body
+
+
+FIELD_NAMES = {
+    section: [f.name for f in fields(model)] for section, model in MODELS.items()
 }
 
 
+def requested_fields(section):
+    """
+    Reads the ``?fields=a,b`` projection of a request.
+
+    Parameters
+    ----------
+    section : str
+        The section being read.
+
+    Returns
+    -------
+    tuple
+        ``(encoder, error)``. ``encoder`` turns a record into a dict holding
+        only the requested fields, or is None if no projection was asked
+        for. ``error`` is a message if the list names unknown fields.
+    """
+    value = request.args.get("fields")
+    if value is None:
+        return None, None
+    names = tuple(
+        dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+    )
+    if not names:
+        return None, "Invalid fields"
+    unknown = [name for name in names if name not in FIELD_NAMES[section]]
+    if unknown:
+        return None, f"Invalid fields: {', '.join(unknown)}"
+    return projection_encoder(MODELS[section], names), None
+
+
+def get_section_item(section, item_id, not_found_message):
+    """
+    Returns a single record, or 304 if the client's copy is current.
+
+    Parameters
+    ----------
+    section : str
+        The section the record belongs to.
+    item_id : int
+        The ID of the record.
+    not_found_message : str
+        The error message to return with a 404.
+
+    Returns
+    -------
+    Response
+        JSON of the record (restricted to ``?fields=`` if given) with status
+        200, an empty 304 response if If-None-Match matches, an error with
+        status 400 if ``fields`` is invalid, or an error with status 404.
+    """
+    encode, error = requested_fields(section)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Read the version before the record: if a write lands in between, the
+    # client gets newer data under an older tag and simply refetches later.
+    etag = resource_etag(section, item_id)
+    if etag is None:
+        return jsonify({"error": not_found_message}), 404
+    tag = matched_etag(etag)
+    if tag is not None:
+        return not_modified(tag)
+
+    def build():
+        item = store.get(section, item_id)
+        if item is None:
+            raise LookupError(item_id)
+        return (item if encode is None else encode(item)), {}
+
+    key = (section, item_id, request.query_string)
+    try:
+        return cached_response(key, etag, build), 200
+    except LookupError:
+        return jsonify({"error": not_found_message}), 404
+
+
+def date_query(section):
+    """
+    Reads the date ordering and filters of a request.
+
+    ``?sort=start_date`` or ``?sort=-end_date`` (latest first) orders the
+    records by a date field, ``?from=`` and ``?to=`` keep those whose date
+    in that field (``start_date`` by default) falls in the inclusive range,
+    and ``?current=1`` keeps those whose end date is "Present". Dates are
+    written like the stored ones, such as ``October 2022`` or ``2022``.
+
+    Parameters
+    ----------
+    section : str
+        The section being read.
+
+    Returns
+    -------
+    tuple
+        ``(query, error)``. ``query`` holds the keyword arguments for
+        ``DateIndex.query``, or is None if no date parameter was given.
+        ``error`` is a message if a parameter is invalid.
+    """
+    sort = request.args.get("sort")
+    start = request.args.get("from")
+    end = request.args.get("to")
+    current = request.args.get("current")
+    if sort is None and start is None and end is None and current is None:
+        return None, None
+    if section not in DATE_FIELDS:
+        return None, "Dates are not supported for this section"
+    field = (sort or "start_date").removeprefix("-")
+    if field not in DATE_FIELDS[section]:
+        return None, "Invalid sort"
+    query = {
+        "field": field,
+        "descending": bool(sort) and sort.startswith("-"),
+        "current": current == "1",
+    }
+    for name, value, bound in (("from", start, "lower"), ("to", end, "upper")):
+        if value is not None:
+            query[bound] = date_key(value, end=bound == "upper")
+            if query[bound] == UNKNOWN:
+                return None, f"Invalid {name}"
+    return query, None
+
+
+def stream_section(section, encode=None, dates=None):
+    """
+    Streams every record of a section as newline-delimited JSON.
+
+    Records come from a snapshot taken when the request starts, so writes
+    made while the response is being sent neither appear in it nor break it.
+    With ``dates``, the records are those the date index selects when the
+    request starts, in its order; each is read as it is sent, and records
+    deleted in the meantime are left out.
+
+    Parameters
+    ----------
+    section : str
+        The section to export.
+    encode : callable, optional
+        Projection applied to each record (see ``requested_fields``).
+    dates : dict, optional
+        Date ordering and filters (see ``date_query``).
+
+    Returns
+    -------
+    Response
+        Streamed ``application/x-ndjson`` response, one record per line.
+    """
+    if dates is None:
+        records = store.snapshot(section)
+    else:
+        pairs = date_index.query(section, **dates)
+        records = (
+            (item_id, item)
+            for _, item_id in pairs
+            if (item := store.get(section, item_id)) is not None
+        )
+    chunk_size = app.config["STREAM_CHUNK_SIZE"]
+    dumps = app.json.dumps
+
+    def generate():
+        chunk = []
+        for _, item in records:
+            chunk.append(dumps(item if encode is None else encode(item)))
+            if len(chunk) >= chunk_size:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    response = app.response_class(generate(), mimetype="application/x-ndjson")
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+def wants_stream():
+    """
+    Returns whether the client asked for an NDJSON stream, with
+    ``?stream=1`` or by preferring ``application/x-ndjson`` in Accept.
+    """
+    if request.args.get("stream") == "1":
+        return True
+    best = request.accept_mimetypes.best_match(
+        ["application/json", "application/x-ndjson"]
+    )
+    return best == "application/x-ndjson"
+
+
+def next_page_link(limit, cursor):
+    """
+    Returns the ``Link`` header that points at the next page: the URL of
+    the current request with its ``limit`` and ``cursor`` replaced.
+    """
+    args = request.args.to_dict()
+    args["limit"] = limit
+    args["cursor"] = cursor
+    return f'<{request.path}?{urlencode(args)}>; rel="next"'
+
+
+def list_section(section):
+    """
+    Returns the records of a section, one page at a time if asked to.
+
+    Without ``limit`` or ``cursor`` query parameters the whole section is
+    returned. Otherwise at most ``limit`` records are returned and, if there
+    are more, a ``Link: <...>; rel="next"`` header points at the next page.
+    With ``?stream=1`` or ``Accept: application/x-ndjson`` the whole section,
+    or every record the date parameters select, is streamed as NDJSON
+    instead (see ``stream_section``). ``?fields=a,b``
+    restricts every record to the named fields. Dated sections can be
+    ordered and filtered by date (see ``date_query``); pages then follow
+    that order.
+
+    Parameters
+    ----------
+    section : str
+        The section to list ('experience', 'education' or 'skill').
+
+    Returns
+    -------
+    Response
+        JSON list of records with status 200, an empty 304 response if
+        If-None-Match matches, or an error with status 400 if ``limit``,
+        ``cursor``, ``fields`` or a date parameter is invalid.
+    """
+    encode, error = requested_fields(section)
+    if error:
+        return jsonify({"error": error}), 400
+    dates, error = date_query(section)
+    if error:
+        return jsonify({"error": error}), 400
+    if wants_stream():
+        return stream_section(section, encode, dates)
+
+    limit = request.args.get("limit")
+    cursor = request.args.get("cursor")
+    after = None
+    if limit is not None or cursor is not None:
+        if limit is None:
+            limit = app.config["DEFAULT_PAGE_LIMIT"]
+        else:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return jsonify({"error": "Invalid limit"}), 400
+            if not 1 <= limit <= app.config["MAX_PAGE_LIMIT"]:
+                return jsonify({"error": "Invalid limit"}), 400
+        if cursor is not None:
+            after = (decode_cursor if dates is None else decode_sort_cursor)(cursor)
+            if after is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+    etag = resource_etag(section)
+    tag = matched_etag(etag)
+    if tag is not None:
+        return not_modified(tag)
+
+    def build():
+        headers = {}
+        if dates is not None:
+            # Fetch one extra record to find out whether there is a next page
+            pairs = date_index.query(
+                section,
+                after=after,
+                limit=None if limit is None else limit + 1,
+                **dates,
+            )
+            if limit is not None and len(pairs) > limit:
+                cursor = encode_sort_cursor(*pairs[limit - 1])
+                headers["Link"] = next_page_link(limit, cursor)
+                pairs = pairs[:limit]
+            items = [store.get(section, item_id) for _, item_id in pairs]
+            items = [item for item in items if item is not None]
+        elif limit is None:
+            items = store.all(section)
+        else:
+            # Fetch one extra record to find out whether there is a next page
+            page = store.page(section, after, limit + 1)
+            if len(page) > limit:
+                cursor = encode_cursor(page[limit - 1][0])
+                headers["Link"] = next_page_link(limit, cursor)
+            items = [item for _, item in page[:limit]]
+        if encode is not None:
+            items = [encode(item) for item in items]
+        return items, headers
+
+    key = (section, None, request.query_string)
+    response = cached_response(key, etag, build)
+    response.vary.add("Accept")
+    return response, 200
+
+
 @app.route("/test")
 def hello_world():
     """
@@ -47,12 +625,260 @@ def hello_world():
     return jsonify({"message": "Hello, World!"})
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """
+    Returns request counters, latency histograms, collection sizes and
+    response cache statistics in the Prometheus text format.
+
+    Returns
+    -------
+    Response
+        The metrics as ``text/plain``.
+    """
+    return app.response_class(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/debug/profiles", methods=["GET"])
+def list_profiles():
+    """
+    Lists the kept request profiles, most recent first.
+
+    A request is profiled when ``PROFILING_ENABLED`` is set and it carries
+    the ``PROFILE_HEADER`` header (``X-Profile``); its response then names
+    the profile in an ``X-Profile-Id`` header.
+
+    Returns
+    -------
+    Response
+        JSON list of ``{"id", "method", "path", "seconds"}`` objects, or an
+        error with status 404 if profiling is disabled.
+    """
+    if not app.config["PROFILING_ENABLED"]:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    return jsonify(profiler.list()), 200
+
+
+@app.route("/debug/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    """
+    Returns one request profile.
+
+    By default this is the ``pstats`` text report sorted by cumulative
+    time; ``?sort=`` picks another ``pstats`` sort key. With
+    ``?format=pstats`` the raw ``.prof`` file is returned instead, for
+    loading into ``pstats`` or a profile viewer.
+
+    Parameters
+    ----------
+    profile_id : str
+        The ID from the ``X-Profile-Id`` response header.
+
+    Returns
+    -------
+    Response
+        The report as ``text/plain`` or the stats as an octet stream. Returns
+        400 if ``sort`` is invalid and 404 if profiling is disabled or the
+        profile is not kept any more.
+    """
+    if not app.config["PROFILING_ENABLED"]:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if request.args.get("format") == "pstats":
+        data = profiler.get(profile_id)
+        if data is None:
+            return jsonify({"error": "Profile not found"}), 404
+        response = app.response_class(data, mimetype="application/octet-stream")
+        response.headers["Content-Disposition"] = (
+            f"attachment; filename={profile_id}.prof"
+        )
+        return response
+    try:
+        report = profiler.report(profile_id, request.args.get("sort", "cumulative"))
+    except KeyError:
+        return jsonify({"error": "Invalid sort"}), 400
+    if report is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return app.response_class(report, mimetype="text/plain")
+
+
+@app.route("/debug/stacks", methods=["GET"])
+def sampled_stacks():
+    """
+    Returns the stacks aggregated by the continuous sampler.
+
+    The sampler runs when ``SAMPLING_INTERVAL`` is non-zero. The output is
+    in the collapsed ``frame;frame count`` format that flamegraph.pl and
+    speedscope read. ``?reset=1`` clears the samples after reading them.
+
+    Returns
+    -------
+    Response
+        The stacks as ``text/plain``, with the number of samples taken in an
+        ``X-Samples`` header, or an error with status 404 if sampling is off.
+    """
+    if not app.config["SAMPLING_INTERVAL"]:
+        return jsonify({"error": "Sampling is disabled"}), 404
+    response = app.response_class(sampler.collapsed(), mimetype="text/plain")
+    response.headers["X-Samples"] = str(sampler.samples)
+    if request.args.get("reset") == "1":
+        sampler.reset()
+    return response
+
+
+@app.route("/logos/<name>", methods=["GET"])
+def logo(name):
+    """
+    Serves a logo image.
+
+    ``/logos/<sha256><ext>`` serves the blob with that digest, if it was
+    stored with that extension. The URL names fixed content, so it is sent
+    with a one-year ``immutable`` Cache-Control header. Responses carry
+    ``nosniff`` and a ``default-src 'none'`` Content-Security-Policy, so an
+    SVG logo cannot run scripts on this origin. Range and conditional
+    requests are supported, and the file is handed to the server's
+    ``wsgi.file_wrapper`` so servers that support it use sendfile instead of
+    copying bytes through Python (set ``USE_X_SENDFILE`` to offload to a
+    front-end proxy instead).
+
+    ``/logos/<file name>`` redirects to the immutable URL of a logo known by
+    its original name, such as ``example-logo.png``.
+
+    Parameters
+    ----------
+    name : str
+        ``<digest><ext>`` or an original logo file name.
+
+    Returns
+    -------
+    Response
+        The image, a 302 redirect to it, or an error with status 404.
+    """
+    digest, extension = os.path.splitext(name)
+    extension = extension.lower()
+    path = logo_store.path(digest, extension)
+    if path is not None:
+        response = send_file(
+            path,
+            mimetype=mimetypes.guess_type(name)[0],
+            conditional=True,
+            etag=digest,
+            max_age=app.config["LOGO_MAX_AGE"],
+        )
+        response.cache_control.immutable = True
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["Content-Security-Policy"] = "default-src 'none'"
+        return response
+
+    digest = logo_store.names.get(name)
+    if digest is not None:
+        response = redirect(url_for("logo", name=digest + extension))
+        response.cache_control.no_cache = True
+        return response
+    return jsonify({"error": "Logo not found"}), 404
+
+
+@app.route("/logos", methods=["POST"])
+def upload_logo():
+    """
+    Stores an uploaded logo image.
+
+    The request body is the raw image and its Content-Type picks the file
+    extension. The image is stored under the digest of its content, so
+    uploading the same image twice stores it once. Records reference the
+    upload by setting their ``logo`` field to the returned ``logo`` value.
+    Blobs that no record references are deleted by a background collector
+    once they are older than ``LOGO_GC_GRACE`` seconds.
+
+    Returns
+    -------
+    Response
+        JSON response with the digest, ``logo`` value and URL of the image,
+        or an error with status 413 or 415.
+    """
+    extension = mimetypes.guess_extension(request.mimetype or "")
+    if extension not in LOGO_EXTENSIONS:
+        return jsonify({"error": "Unsupported logo type"}), 415
+    try:
+        digest = logo_store.put(
+            request.stream, extension, max_size=app.config["LOGO_MAX_SIZE"]
+        )
+    except LogoTooLarge:
+        return jsonify({"error": "Logo too large"}), 413
+    name = digest + extension
+    return jsonify(
+        {"digest": digest, "logo": name, "url": url_for("logo", name=name)}
+    ), 201
+
+
+@app.route("/resume", methods=["GET"])
+def resume():
+    """
+    Returns every section of the resume in one response.
+
+    The document is stitched together from the cached JSON of each
+    section (see ``section_fragment``), so after a write only the section
+    that changed is encoded again. Supports the same ETag, If-None-Match
+    and compression handling as the section GETs.
+
+    Returns
+    -------
+    Response
+        JSON object mapping each section name to its list of records, with
+        status 200, or an empty 304 response if If-None-Match matches.
+    """
+    etag = resume_etag()
+    tag = matched_etag(etag)
+    if tag is not None:
+        return not_modified(tag)
+
+    def build():
+        parts = [
+            b'"%s":%s' % (section.encode(), section_fragment(section).rstrip())
+            for section in MODELS
+        ]
+        return b"{" + b",".join(parts) + b"}\n", {}
+
+    return cached_response(("resume", None, b""), etag, build, encoded=True), 200
+
+
+@app.route("/resume.<any(html, md):document_format>", methods=["GET"])
+def rendered_resume(document_format):
+    """
+    Returns the resume as an HTML page or a Markdown document.
+
+    Every record is rendered once, when it is written, and the document is
+    stitched from those fragments on the first view after a write (see
+    ``DocumentRenderer``), so views cost almost nothing.
+
+    Parameters
+    ----------
+    document_format : str
+        ``html`` or ``md``.
+
+    Returns
+    -------
+    Response
+        The document with status 200, or an empty 304 response if
+        If-None-Match matches.
+    """
+    etag = hashlib.blake2b(
+        f"{resume_etag()}:{document_format}".encode(), digest_size=16
+    ).hexdigest()
+    if etag in request.if_none_match:
+        return not_modified(etag)
+    response = app.response_class(
+        renderer.document(document_format), mimetype=FORMATS[document_format][0]
+    )
+    response.set_etag(etag)
+    return response
+
+
 @app.route("/resume/experience", methods=["GET", "POST"])
 def experience():
     """
     Handles experience data requests.
 
-    GET: Returns all stored experience entries.
+    GET: Returns stored experience entries, paginated with ?limit= and ?cursor=.
     POST: Adds a new experience entry.
 
     Returns
@@ -63,27 +889,16 @@ def experience():
         Returns 405 if method is not allowed.
     """
     if request.method == "GET":
-        return jsonify(data["experience"]), 200
+        return list_section("experience")
 
     if request.method == "POST":
-        try:
-            experience_data = request.get_json()
-            is_valid, error_message = validate_data("experience", experience_data)
-            if not is_valid:
-                return jsonify({"error": error_message}), 400
-
-            new_experience = Experience(
-                experience_data["title"],
-                experience_data["company"],
-                experience_data["start_date"],
-                experience_data["end_date"],
-                experience_data["description"],
-                experience_data["logo"],
-            )
-            data["experience"].append(new_experience)
-            return jsonify({"id": len(data["experience"]) - 1}), 201
-        except (TypeError, ValueError, KeyError):
-            return jsonify({"error": "Invalid data format"}), 400
+        new_experience, error_message = validate_record(
+            "experience", request.get_json()
+        )
+        if new_experience is None:
+            return jsonify({"error": error_message}), 400
+        item_id = store.add("experience", new_experience)
+        return jsonify({"id": item_id}), 201
 
     return jsonify({"error": "Method not allowed"}), 405
 
@@ -91,34 +906,30 @@ def experience():
 @app.route("/resume/experience/<int:index>", methods=["GET"])
 def get_experience_by_index(index):
     """
-    Retrieves an experience entry by index.
+    Retrieves an experience entry by ID.
 
     Parameters
     ----------
     index : int
-        The index of the experience entry to retrieve.
+        The ID of the experience entry to retrieve.
 
     Returns
     -------
     Response
         JSON of the experience entry if found, otherwise 404 error.
     """
-    try:
-        experience_item = data["experience"][index]
-        return jsonify(experience_item)
-    except IndexError:
-        return jsonify({"error": "Experience not found"}), 404
+    return get_section_item("experience", index, "Experience not found")
 
 
 @app.route("/resume/experience/<int:item_id>", methods=["PUT"])
 def update_experience(item_id):
     """
-    Update an experience by index.
+    Update an experience by ID.
 
     Parameters
     ----------
     item_id : int
-        The index of the experience to update.
+        The ID of the experience to update.
 
     Returns
     -------
@@ -131,26 +942,23 @@ def update_experience(item_id):
     if not content:
         return jsonify({"error": "Invalid request"}), 400
 
-    if 0 <= item_id < len(data["experience"]):
-        try:
-            valid_keys = {f.name for f in fields(Experience)}
-            filtered_content = {k: v for k, v in content.items() if k in valid_keys}
-            data["experience"][item_id] = Experience(**filtered_content)
-            return jsonify({"message": "Experience updated successfully"}), 200
-        except TypeError as e:
-            return jsonify({"error": f"Missing or invalid fields: {str(e)}"}), 400
+    updated_experience, error_message = validate_record("experience", content)
+    if updated_experience is None:
+        return jsonify({"error": f"Missing or invalid fields: {error_message}"}), 400
 
+    if store.update("experience", item_id, updated_experience):
+        return jsonify({"message": "Experience updated successfully"}), 200
     return jsonify({"error": "Experience not found"}), 404
 
 @app.route("/resume/experience/<int:item_id>", methods=["DELETE"])
 def delete_experience(item_id):
     """
-    Delete an experience by index.
+    Delete an experience by ID.
 
     Parameters
     ----------
     item_id : int
-        The index of the experience to delete.
+        The ID of the experience to delete.
 
     Returns
     -------
@@ -159,40 +967,16 @@ def delete_experience(item_id):
         Returns 404 if experience not found.
         Returns 400 if request is invalid.
     """
-    if item_id < 0 or item_id >= len(data["experience"]):
+    if not store.delete("experience", item_id):
         return jsonify({"error": "Invalid request"}), 400
-    data["experience"].pop(item_id)
     return jsonify({"message": "Experience has been deleted"}), 200
 
-@app.route("/resume/experience/<int:item_id>", methods=["DELETE"])
-def delete_experience(item_id):
-    """
-    Delete an experience by index.
-
-    Parameters
-    ----------
-    item_id : int
-        The index of the experience to delete.
-
-    Returns
-    -------
-    Response
-        JSON message indicating success or error.
-        Returns 404 if experience not found.
-        Returns 400 if request is invalid.
-    """
-    if item_id < 0 or item_id >= len(data["experience"]):
-        return jsonify({"error": "Invalid request"}), 400
-    data["experience"].pop(item_id)
-    return jsonify({"message": "Experience has been deleted"}), 200
-
-
 @app.route("/resume/education", methods=["GET", "POST"])
 def education():
     """
     Handles GET and POST requests for education entries.
 
-    GET: Returns all stored education entries.
+    GET: Returns stored education entries, paginated with ?limit= and ?cursor=.
     POST: Adds a new education entry to the system after validating required fields.
 
     Returns
@@ -200,7 +984,7 @@ def education():
     Response
         JSON response containing:
         - All education entries with status 200 (on GET).
-        - The index of the newly added entry with status 201 (on valid POST).
+        - The ID of the newly added entry with status 201 (on valid POST).
         - An error message with status 400 if POST data is missing or invalid.
         - An error message with status 405 if the HTTP method is not allowed.
     """
@@ -211,27 +995,17 @@ def education():
         if not content:
             return jsonify({"error": "Bad request"}), 400
 
-        # Check if all required fields are present:
-        required_fields = [
-            'course', 'school', 'start_date', 'end_date', 'grade', 'logo'
-        ]
-        if not all( key in content for key in required_fields):
-            return jsonify({"error": "Missing required fields"}), 400
-
-        # Create a new Education object, add it to the data, and return the index:
-        new_education = Education(
-            content['course'],
-            content['school'],
-            content['start_date'],
-            content['end_date'],
-            content['grade'],
-            content['logo']
-        )
-        data['education'].append(new_education)
-        return jsonify({"id": len(data['education']) - 1}), 201
+        # Check the fields and build a new Education object:
+        new_education, error_message = validate_record("education", content)
+        if new_education is None:
+            return jsonify({"error": error_message}), 400
+
+        # Store it and return its ID:
+        item_id = store.add("education", new_education)
+        return jsonify({"id": item_id}), 201
 
     if request.method == "GET":
-        return jsonify(data["education"]), 200
+        return list_section("education")
 
     return jsonify({"error": "Method not allowed"}), 405
 
@@ -239,20 +1013,15 @@ def education():
 @app.route("/resume/education/<int:index>", methods=["GET", "DELETE"])
 def education_by_index(index):
     """
-    Handles education requests by index
+    Handles education requests by ID
     This function handles two types of HTTP requests:
-    - GET: Retrieves a specific education by index
-    - DELETE: Deletes a specific education by index
+    - GET: Retrieves a specific education by ID
+    - DELETE: Deletes a specific education by ID
     """
     if request.method == "GET":
-        try:
-            education_item = data["education"][index]
-            return jsonify(education_item)
-        except IndexError:
-            return jsonify({"error": "Education not found"}), 404
+        return get_section_item("education", index, "Education not found")
     if request.method == "DELETE":
-        if 0 <= index < len(data["education"]):
-            data["education"].pop(index)
+        if store.delete("education", index):
             return jsonify({"message": "Education has been deleted"}), 200
         return jsonify({"error": "400 Bad Request"}), 400
     return jsonify({"error": "Method not allowed"}), 405
@@ -261,12 +1030,12 @@ def education_by_index(index):
 @app.route("/resume/education/<int:item_id>", methods=["PUT"])
 def update_education(item_id):
     """
-    Update an education by index.
+    Update an education by ID.
 
     Parameters
     ----------
     item_id : int
-        The index of the education to update.
+        The ID of the education to update.
 
     Returns
     -------
@@ -279,15 +1048,12 @@ def update_education(item_id):
     if not content:
         return jsonify({"error": "Invalid request"}), 400
 
-    if 0 <= item_id < len(data["education"]):
-        try:
-            valid_keys = {f.name for f in fields(Education)}
-            filtered_content = {k: v for k, v in content.items() if k in valid_keys}
-            data["education"][item_id] = Education(**filtered_content)
-            return jsonify({"message": "Education updated successfully"}), 200
-        except TypeError as e:
-            return jsonify({"error": f"Missing or invalid fields: {str(e)}"}), 400
+    updated_education, error_message = validate_record("education", content)
+    if updated_education is None:
+        return jsonify({"error": f"Missing or invalid fields: {error_message}"}), 400
 
+    if store.update("education", item_id, updated_education):
+        return jsonify({"message": "Education updated successfully"}), 200
     return jsonify({"error": "Education not found"}), 404
 
 
@@ -296,44 +1062,25 @@ def skill():
     """
     Handles skill data requests.
 
-    GET: Returns all stored skill entries.
-    POST: Adds a new skill entry (to be implemented).
+    GET: Returns stored skill entries, paginated with ?limit= and ?cursor=.
+    POST: Adds a new skill entry.
 
     Returns
     -------
     Response
-        JSON of skill data (or empty placeholder) on GET.
+        JSON list of skill entries (on GET) or a new entry ID (on POST).
+        Returns 400 if the POST data is missing fields or has invalid values.
         Returns 405 if method is not allowed.
     """
     if request.method == "GET":
-        return jsonify(data["skill"]), 200
-
-    # if request.method == "POST":
-    #     try:
-    #         skill_data = request.get_json()
-    #         is_valid, error_message = validate_data("skill", skill_data)
-    #         if not is_valid:
-    #             return jsonify({"error": error_message}), 400
-    #         # pylint: disable=fixme
-    #         # TODO: Create new Skill object with skill_data
-    #         # TODO: Append new skill to data['skill']
-    #         # TODO: Return jsonify({"id": len(data['skill']) - 1}), 201
-    #         return jsonify({}), 201
-    #     except (TypeError, ValueError, KeyError):
-    #         return jsonify({"error": "Invalid data format"}), 400
+        return list_section("skill")
 
     if request.method == "POST":
-        experience_data = request.get_json()
-
-        if not all(key in experience_data for key in ["name", "proficiency", "logo"]):
-            return jsonify({"error": "Missing required fields"}), 400
-
-        data["skill"].append(
-            Skill(
-                request.json["name"], request.json["proficiency"], request.json["logo"]
-            )
-        )
-        return jsonify({"id": len(data["skill"]) - 1}), 201
+        new_skill, error_message = validate_record("skill", request.get_json())
+        if new_skill is None:
+            return jsonify({"error": error_message}), 400
+        item_id = store.add("skill", new_skill)
+        return jsonify({"id": item_id}), 201
 
     return jsonify({"error": "Method not allowed"}), 405
 
@@ -341,25 +1088,124 @@ def skill():
 @app.route("/resume/skill/<int:index>", methods=["GET"])
 def get_skill_by_index(index):
     """
-    Get a specific skill by index
+    Get a specific skill by ID
     """
-    try:
-        skill_index = data["skill"][index]
-        return jsonify(skill_index), 200
-    except IndexError:
-        return jsonify({"error": "Skill not found"}), 404
+    return get_section_item("skill", index, "Skill not found")
 
 
 @app.route("/resume/skill/<int:index>", methods=["DELETE"])
 def delete_skill(index):
     """
-    Delete specific skill by index
+    Delete specific skill by ID
     """
-    if 0 <= index < len(data["skill"]):
-        data["skill"].pop(index)
+    if store.delete("skill", index):
         return jsonify({"message": "Successfully deleted skill"}), 200
     return jsonify({"error": "Skill not found"}), 404
 
 
+@app.route("/resume/search", methods=["GET"])
+def search():
+    """
+    Searches titles, companies, descriptions, courses, schools and skill names.
+
+    Query parameters: ``q`` (required) is the search text, ``section``
+    restricts results to one section and ``limit`` caps the number of
+    results (default 10).
+
+    Returns
+    -------
+    Response
+        JSON list of ``{"section", "id", "score", "item"}`` objects, best
+        match first. Returns 400 if ``q``, ``section`` or ``limit`` is invalid.
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing search query"}), 400
+    section = request.args.get("section")
+    if section is not None and section not in MODELS:
+        return jsonify({"error": "Invalid section"}), 400
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if not 1 <= limit <= app.config["MAX_PAGE_LIMIT"]:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    results = []
+    for score, item_section, item_id in search_index.search(query, limit, section):
+        item = store.get(item_section, item_id)
+        if item is not None:
+            results.append(
+                {"section": item_section, "id": item_id, "score": score, "item": item}
+            )
+    return jsonify(results), 200
+
+
+@app.route("/resume/<section>/bulk", methods=["POST"])
+def bulk_import(section):
+    """
+    Imports many entries of a section from newline-delimited JSON.
+
+    The request body holds one JSON object per line. Lines are read and
+    validated one at a time as they arrive and stored in batches of
+    ``BULK_BATCH_SIZE``, so memory use does not grow with the size of the
+    upload.
+
+    Parameters
+    ----------
+    section : str
+        The section to import into ('experience', 'education' or 'skill').
+
+    Returns
+    -------
+    Response
+        Streamed NDJSON with one result per input line, either
+        ``{"line": n, "id": id}`` or ``{"line": n, "error": message}``,
+        followed by a ``{"created": n, "failed": n}`` summary.
+        Returns 404 if the section does not exist.
+    """
+    if section not in MODELS:
+        return jsonify({"error": "Section not found"}), 404
+    batch_size = app.config["BULK_BATCH_SIZE"]
+    stream = request.stream
+
+    def flush(batch):
+        item_ids = store.add_many(section, [item for _, item in batch])
+        return "".join(
+            app.json.dumps({"line": line_number, "id": item_id}) + "\n"
+            for (line_number, _), item_id in zip(batch, item_ids)
+        )
+
+    def generate():
+        batch = []
+        created = failed = 0
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                content = app.json.loads(line)
+            except ValueError:
+                content = None
+            item, error_message = validate_record(section, content)
+            if item is None:
+                failed += 1
+                result = {"line": line_number, "error": error_message}
+                yield app.json.dumps(result) + "\n"
+                continue
+            batch.append((line_number, item))
+            if len(batch) >= batch_size:
+                created += len(batch)
+                yield flush(batch)
+                batch = []
+        if batch:
+            created += len(batch)
+            yield flush(batch)
+        yield app.json.dumps({"created": created, "failed": failed}) + "\n"
+
+    return app.response_class(
+        stream_with_context(generate()), mimetype="application/x-ndjson"
+    )
+
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,243 @@
+"""
+ASGI Application
+
+Serves the ``/resume/<section>`` routes from an asyncio event loop, so one
+process can hold thousands of idle keep-alive and long-poll connections.
+It shares the models, validation and storage of the Flask application.
+
+Run with any ASGI server, for example ``uvicorn asgi:application``.
+"""
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from app import app, resource_etag, store
+from models import MODELS
+from storage import ColumnarMemoryStorage, MemoryStorage
+from utils import validate_record
+
+MAX_BODY_SIZE = 1024 * 1024
+MAX_WAIT = 60
+
+# Section -> (success message, status and error when the record is missing)
+# of a DELETE, as returned by the Flask routes.
+DELETE_RESPONSES = {
+    "experience": ("Experience has been deleted", 400, "Invalid request"),
+    "education": ("Education has been deleted", 400, "400 Bad Request"),
+    "skill": ("Successfully deleted skill", 404, "Skill not found"),
+}
+
+# Sections whose records can be replaced with PUT
+UPDATABLE_SECTIONS = {"experience", "education"}
+
+
+class ChangeNotifier:
+    """
+    Wakes coroutines waiting for a section to change.
+
+    Storage listeners can run on any thread, so waiters are woken through
+    their own event loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self._waiters = {section: set() for section in MODELS}
+
+    def __call__(self, section, item_id, item):
+        for loop, future in list(self._waiters[section]):
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, section, timeout):
+        """
+        Waits until ``section`` changes or ``timeout`` seconds pass.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        self._waiters[section].add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters[section].discard(waiter)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+notifier = ChangeNotifier()
+store.subscribe(notifier)
+
+
+async def call_store(method, *args):
+    """
+    Calls a storage method without blocking the event loop.
+
+    In-memory operations finish in microseconds and run inline; anything
+    else (SQLite, or a write-ahead log that may fsync) runs in a worker
+    thread.
+    """
+    if type(store) in (MemoryStorage, ColumnarMemoryStorage):
+        return method(*args)
+    return await asyncio.to_thread(method, *args)
+
+
+def collection_etag(section):
+    """
+    Returns the quoted ETag of a whole section, the same one the Flask app
+    sends for ``GET /resume/<section>``.
+    """
+    return f'"{resource_etag(section, query=b"")}"'
+
+
+async def read_body(receive):
+    """
+    Reads the full request body, or returns None if it is too large.
+    """
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_SIZE:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def send_json(send, status, data, headers=()):
+    """
+    Sends ``data`` as a complete JSON response.
+    """
+    body = b"" if data is None else (app.json.dumps(data) + "\n").encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def list_section(section, query, request_headers, send):
+    """
+    GET /resume/<section>: returns every record of a section.
+
+    ``If-None-Match`` with the current ETag gives a 304. Adding
+    ``?wait=<seconds>`` turns that into a long poll: the response is held
+    until the section changes or the wait runs out.
+    """
+    etag = await call_store(collection_etag, section)
+    if request_headers.get(b"if-none-match", b"").decode() == etag:
+        try:
+            wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT)
+        except ValueError:
+            return await send_json(send, 400, {"error": "Invalid wait"})
+        if wait > 0:
+            await notifier.wait(section, wait)
+            etag = await call_store(collection_etag, section)
+        if request_headers.get(b"if-none-match", b"").decode() == etag:
+            return await send_json(send, 304, None, [(b"etag", etag.encode())])
+    items = await call_store(store.all, section)
+    return await send_json(send, 200, items, [(b"etag", etag.encode())])
+
+
+async def handle(method, section, item_id, query, request_headers, receive, send):
+    """
+    Dispatches one request to the matching resume operation.
+    """
+    model = MODELS[section]
+    not_found = {"error": f"{section.capitalize()} not found"}
+
+    if item_id is None and method == "GET":
+        return await list_section(section, query, request_headers, send)
+
+    if item_id is None and method == "POST":
+        body = await read_body(receive)
+        if body is None:
+            return await send_json(send, 413, {"error": "Request body too large"})
+        try:
+            content = json.loads(body)
+        except ValueError:
+            return await send_json(send, 400, {"error": "Invalid data format"})
+        item, error_message = validate_record(section, content)
+        if item is None:
+            return await send_json(send, 400, {"error": error_message})
+        new_id = await call_store(store.add, section, item)
+        return await send_json(send, 201, {"id": new_id})
+
+    if item_id is not None and method == "GET":
+        item = await call_store(store.get, section, item_id)
+        if item is None:
+            return await send_json(send, 404, not_found)
+        return await send_json(send, 200, item)
+
+    if item_id is not None and method == "PUT" and section in UPDATABLE_SECTIONS:
+        body = await read_body(receive)
+        if body is None:
+            return await send_json(send, 413, {"error": "Request body too large"})
+        try:
+            content = json.loads(body)
+        except ValueError:
+            content = None
+        if not isinstance(content, dict) or not content:
+            return await send_json(send, 400, {"error": "Invalid request"})
+        item, error_message = validate_record(section, content)
+        if item is None:
+            return await send_json(
+                send, 400, {"error": f"Missing or invalid fields: {error_message}"}
+            )
+        if await call_store(store.update, section, item_id, item):
+            return await send_json(
+                send, 200, {"message": f"{model.__name__} updated successfully"}
+            )
+        return await send_json(send, 404, not_found)
+
+    if item_id is not None and method == "DELETE":
+        message, status, error = DELETE_RESPONSES[section]
+        if await call_store(store.delete, section, item_id):
+            return await send_json(send, 200, {"message": message})
+        return await send_json(send, status, {"error": error})
+
+    return await send_json(send, 405, {"error": "Method not allowed"})
+
+
+async def application(scope, receive, send):
+    """
+    ASGI entry point.
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    parts = scope["path"].strip("/").split("/")
+    item_id = None
+    if len(parts) == 3 and re.fullmatch(r"[0-9]+", parts[2]):
+        item_id = int(parts[2])
+    elif len(parts) != 2:
+        parts = []
+    if not parts or parts[0] != "resume" or parts[1] not in MODELS:
+        return await send_json(send, 404, {"error": "Not found"})
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    request_headers = dict(scope["headers"])
+    await handle(
+        scope["method"], parts[1], item_id, query, request_headers, receive, send
+    )
@@ -0,0 +1,193 @@
+"""
+Benchmark: how many idle connections the threaded Flask server and the
+ASGI application can hold, and what they cost.
+
+For each server and each connection count, the benchmark opens that many
+connections and sends only the start of a request line, like a slow client
+or a keep-alive connection waiting for its next request. It then times
+probe requests, each on a fresh connection, and reads the server's thread
+count and resident memory from /proc. The threaded server spends one
+thread per idle connection; the event loop spends one small object. The
+ASGI run needs ``uvicorn`` installed.
+
+Run from the repository root with ``python -m benchmarks.bench_concurrency``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    "flask-threaded": [
+        sys.executable,
+        "-c",
+        "import sys; from werkzeug.serving import run_simple; from app import app; "
+        "run_simple('127.0.0.1', int(sys.argv[1]), app, threaded=True)",
+    ],
+    "asgi-uvicorn": [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "asgi:application",
+        "--log-level",
+        "warning",
+        "--timeout-keep-alive",
+        "600",
+        "--port",
+    ],
+}
+
+REQUEST = b"GET /resume/skill HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+
+def free_port():
+    """
+    Returns a TCP port that is free right now.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_stats(pid):
+    """
+    Returns the thread count and resident memory (KiB) of a process.
+    """
+    stats = {}
+    with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+        for line in status:
+            key, _, value = line.partition(":")
+            if key == "Threads":
+                stats["threads"] = int(value)
+            elif key == "VmRSS":
+                stats["rss_kib"] = int(value.split()[0])
+    return stats
+
+
+async def read_response(reader):
+    """
+    Reads one HTTP/1.1 response with a Content-Length body.
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return head
+
+
+async def open_idle(port):
+    """
+    Opens a connection, sends the first bytes of a request and leaves it open.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(REQUEST[:4])
+    await writer.drain()
+    return reader, writer
+
+
+async def probe(port, count):
+    """
+    Times ``count`` requests, each on a fresh connection, in milliseconds.
+    """
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(REQUEST)
+        await writer.drain()
+        await read_response(reader)
+        timings.append((time.perf_counter() - start) * 1000)
+        writer.close()
+    return timings
+
+
+async def measure(port, pid, connections, timeout):
+    """
+    Holds ``connections`` idle connections and probes the server.
+    """
+    results = await asyncio.gather(
+        *(asyncio.wait_for(open_idle(port), timeout) for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        timings = await asyncio.wait_for(probe(port, 50), timeout)
+        latency = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "max_ms": round(max(timings), 3),
+        }
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        latency = {"p50_ms": None, "max_ms": None}
+    stats = process_stats(pid)
+    await asyncio.sleep(0.1)
+    # Connections the server has already closed are not being held
+    held = sum(not reader.at_eof() for reader, _ in opened)
+    for _, writer in opened:
+        writer.close()
+    return {
+        "connections": connections,
+        "held": held,
+        **latency,
+        **stats,
+    }
+
+
+def run_server(name, levels, timeout):
+    """
+    Starts one server in a subprocess and measures every connection level.
+    """
+    port = free_port()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [*SERVERS[name], str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                if process.poll() is not None:
+                    return {"server": name, "error": "server failed to start"}
+                time.sleep(0.1)
+        results = [
+            asyncio.run(measure(port, process.pid, level, timeout)) for level in levels
+        ]
+        return {"server": name, "results": results}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    """
+    Runs the benchmark and prints the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--connections", default="10,100,500,1000", help="comma-separated levels"
+    )
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--servers", default=",".join(SERVERS))
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.connections.split(",")]
+    report = [
+        run_server(name, levels, args.timeout) for name in args.servers.split(",")
+    ]
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("PYTHONPATH", os.getcwd())
+    main()
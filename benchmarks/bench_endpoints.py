@@ -0,0 +1,336 @@
+"""
+Benchmark: latency and throughput of every route of the Flask application.
+
+Each route is driven in turn, and then a read/write mix, through two
+transports: Flask's test client (the application alone) and a real threaded
+Werkzeug server on a local port (the application plus HTTP). Collections are
+filled to ``--size`` records first. Results are printed as JSON with p50,
+p95 and p99 latency in milliseconds and requests per second, so runs can be
+saved and compared.
+
+Run from the repository root with ``python -m benchmarks.bench_endpoints``.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import app, logo_store, store
+from benchmarks.bench_json import make_records
+
+RECORDS = {
+    "experience": {
+        "title": "Software Developer",
+        "company": "A Cool Company",
+        "start_date": "October 2022",
+        "end_date": "Present",
+        "description": "Writing Python Code",
+        "logo": "example-logo.png",
+    },
+    "education": {
+        "course": "Computer Science",
+        "school": "University of Tech",
+        "start_date": "September 2019",
+        "end_date": "July 2022",
+        "grade": "80%",
+        "logo": "example-logo.png",
+    },
+    "skill": {"name": "Python", "proficiency": "1-2 Years", "logo": "example-logo.png"},
+}
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """
+    Request handler that does not log every request to stderr.
+    """
+
+    def log_request(self, code="-", size="-"):
+        pass
+
+
+class TestClientTransport:
+    """
+    Sends requests through Flask's test client.
+    """
+
+    name = "test-client"
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def __call__(self, method, path, body=None, content_type=None):
+        response = self.client.open(
+            path, method=method, data=body, content_type=content_type
+        )
+        response.close()
+        return response.status_code
+
+    def close(self):
+        """
+        Nothing to release.
+        """
+
+
+class ServerTransport:
+    """
+    Sends requests over HTTP to a threaded Werkzeug server started in this
+    process, one connection per request.
+    """
+
+    name = "threaded-server"
+
+    def __init__(self):
+        self.server = make_server(
+            "127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler
+        )
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __call__(self, method, path, body=None, content_type=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        try:
+            headers = {"Content-Type": content_type} if content_type else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def close(self):
+        """
+        Stops the server.
+        """
+        self.server.shutdown()
+        self.thread.join()
+
+
+def json_body(section):
+    """
+    Returns a JSON request body for a new record of ``section``.
+    """
+    return json.dumps(RECORDS[section]).encode(), "application/json"
+
+
+def has_route(method, path):
+    """
+    Tells whether the application has a route for ``method`` and ``path``.
+    """
+    try:
+        app.url_map.bind("localhost").match(path.partition("?")[0], method=method)
+    except HTTPException:
+        return False
+    return True
+
+
+def make_scenarios(sections, bulk_size):
+    """
+    Returns ``{name: (kind, make_request)}`` for every route, where
+    ``make_request(rng)`` returns ``(method, path, body, content_type)``.
+
+    DELETE requests remove a record added just for them, so deletes never
+    run out of records and do not shrink the collection.
+    """
+    ids = {
+        section: [item_id for item_id, _ in store.snapshot(section)]
+        for section in sections
+    }
+    logo = next(iter(logo_store.names.values()))
+    scenarios = {
+        "GET /test": ("read", lambda rng: ("GET", "/test", None, None)),
+        "GET /logos/<digest>": (
+            "read",
+            lambda rng: ("GET", f"/logos/{logo}.png", None, None),
+        ),
+        "GET /resume/search": (
+            "read",
+            lambda rng: ("GET", "/resume/search?q=python+developer", None, None),
+        ),
+        "GET /metrics": ("read", lambda rng: ("GET", "/metrics", None, None)),
+        "GET /resume": ("read", lambda rng: ("GET", "/resume", None, None)),
+        "GET /resume.html": ("read", lambda rng: ("GET", "/resume.html", None, None)),
+        "GET /resume.md": ("read", lambda rng: ("GET", "/resume.md", None, None)),
+        "POST /logos": (
+            "write",
+            lambda rng: ("POST", "/logos", rng.randbytes(512), "image/png"),
+        ),
+    }
+    for section in sections:
+        base = f"/resume/{section}"
+        section_ids = ids[section]
+        item = store.get(section, section_ids[0])
+        scenarios.update({
+            f"GET {base}": ("read", lambda rng, base=base: ("GET", base, None, None)),
+            f"GET {base}?limit=20": (
+                "read",
+                lambda rng, base=base: ("GET", f"{base}?limit=20", None, None),
+            ),
+            f"GET {base}/<id>": (
+                "read",
+                lambda rng, base=base, section_ids=section_ids: (
+                    "GET", f"{base}/{rng.choice(section_ids)}", None, None
+                ),
+            ),
+            f"POST {base}": (
+                "write",
+                lambda rng, base=base, section=section: (
+                    "POST", base, *json_body(section)
+                ),
+            ),
+            f"PUT {base}/<id>": (
+                "write",
+                lambda rng, base=base, section=section, section_ids=section_ids: (
+                    "PUT", f"{base}/{rng.choice(section_ids)}", *json_body(section)
+                ),
+            ),
+            f"DELETE {base}/<id>": (
+                "write",
+                lambda rng, base=base, section=section, item=item: (
+                    "DELETE", f"{base}/{store.add(section, item)}", None, None
+                ),
+            ),
+            f"POST {base}/bulk": (
+                "write",
+                lambda rng, base=base, section=section: (
+                    "POST",
+                    f"{base}/bulk",
+                    b"\n".join([json_body(section)[0]] * bulk_size),
+                    "application/x-ndjson",
+                ),
+            ),
+        })
+    return {
+        name: scenario
+        for name, scenario in scenarios.items()
+        if has_route(*scenario[1](random.Random(0))[:2])
+    }
+
+
+def restore(initial):
+    """
+    Deletes every record added since ``initial`` (``{section: set of ids}``)
+    was taken, so every run sees collections of the same size.
+    """
+    for section, ids in initial.items():
+        for item_id in [item_id for item_id, _ in store.snapshot(section)]:
+            if item_id not in ids:
+                store.delete(section, item_id)
+
+
+def drive(transport, make_request, count, concurrency, seed):
+    """
+    Sends ``count`` requests from ``concurrency`` threads and returns the
+    latencies in milliseconds, the wall-clock time and the error count.
+    """
+    rngs = [random.Random(seed + worker) for worker in range(concurrency)]
+
+    def worker(index):
+        timings = []
+        errors = 0
+        rng = rngs[index]
+        for _ in range(index, count, concurrency):
+            method, path, body, content_type = make_request(rng)
+            start = time.perf_counter()
+            status = transport(method, path, body, content_type)
+            timings.append((time.perf_counter() - start) * 1000)
+            errors += status >= 400
+        return timings, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    timings = [timing for result in results for timing in result[0]]
+    return timings, elapsed, sum(result[1] for result in results)
+
+
+def summarize(transport, route, timings, elapsed, errors):
+    """
+    Reduces the latencies of one run to percentiles and throughput.
+    """
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "transport": transport,
+        "route": route,
+        "requests": len(timings),
+        "errors": errors,
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "rps": round(len(timings) / elapsed, 1),
+    }
+
+
+def main():
+    """
+    Runs the benchmark and prints the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000, help="records per section")
+    parser.add_argument("--requests", type=int, default=500, help="requests per run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--read-ratio", type=float, default=0.9, help="share of reads in the mix"
+    )
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--transports", default="test-client,threaded-server")
+    parser.add_argument("--routes", default="", help="substring filter on route names")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app.config["LOGO_MAX_SIZE"] = 1024
+    for section, items in make_records(args.size).items():
+        store.add_many(section, items)
+    scenarios = make_scenarios(list(RECORDS), args.bulk_size)
+    reads = [make for kind, make in scenarios.values() if kind == "read"]
+    writes = [
+        make
+        for name, (kind, make) in scenarios.items()
+        if kind == "write" and "bulk" not in name
+    ]
+
+    def mixed(rng):
+        return rng.choice(reads if rng.random() < args.read_ratio else writes)(rng)
+
+    initial = {
+        section: {item_id for item_id, _ in store.snapshot(section)}
+        for section in RECORDS
+    }
+    scenarios[f"mixed {args.read_ratio:.0%} reads"] = ("mixed", mixed)
+
+    transports = {
+        "test-client": TestClientTransport,
+        "threaded-server": ServerTransport,
+    }
+    report = {"config": vars(args), "results": []}
+    for name in args.transports.split(","):
+        transport = transports[name]()
+        try:
+            for route, (_, make_request) in scenarios.items():
+                if args.routes not in route:
+                    continue
+                timings, elapsed, errors = drive(
+                    transport, make_request, args.requests, args.concurrency, args.seed
+                )
+                report["results"].append(
+                    summarize(name, route, timings, elapsed, errors)
+                )
+                restore(initial)
+        finally:
+            transport.close()
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
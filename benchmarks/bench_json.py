@@ -0,0 +1,88 @@
+"""
+Benchmark: encoding resume records with Flask's default JSON provider
+versus ResumeJSONProvider.
+
+Run from the repository root with ``python -m benchmarks.bench_json``.
+"""
+
+import argparse
+import timeit
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import ResumeJSONProvider
+from models import Education, Experience, Skill
+
+
+def make_records(size):
+    """
+    Builds ``size`` records of each model.
+    """
+    return {
+        "experience": [
+            Experience(
+                f"Software Developer {i}",
+                "A Cool Company",
+                "October 2022",
+                "Present",
+                "Writing Python Code " * 5,
+                "example-logo.png",
+            )
+            for i in range(size)
+        ],
+        "education": [
+            Education(
+                f"Course {i}",
+                "University of Tech",
+                "September 2019",
+                "July 2022",
+                "80%",
+                "example-logo.png",
+            )
+            for i in range(size)
+        ],
+        "skill": [
+            Skill(f"Skill {i}", "1-2 Years", "example-logo.png") for i in range(size)
+        ],
+    }
+
+
+def main():
+    """
+    Times one list response per section with each provider and prints the
+    per-request cost and speedup.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {
+        "default": DefaultJSONProvider(app),
+        "resume": ResumeJSONProvider(app),
+    }
+    records = make_records(args.size)
+
+    with app.app_context():
+        for section, items in records.items():
+            timings = {}
+            for name, provider in providers.items():
+                timings[name] = min(
+                    timeit.repeat(
+                        lambda provider=provider: provider.response(items),
+                        number=1,
+                        repeat=args.repeat,
+                    )
+                )
+            print(
+                f"{section:<10} {args.size} records: "
+                f"default {timings['default'] * 1000:7.2f} ms, "
+                f"resume {timings['resume'] * 1000:7.2f} ms, "
+                f"speedup {timings['default'] / timings['resume']:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark: memory used per 100k records by each in-process representation.
+
+Compares lists of plain dataclasses (the original models) and of the
+slotted, interned models, then the full ``MemoryStorage`` (which adds an ID
+map and version counters) and ``ColumnarMemoryStorage``. Field values are
+built at run time, as they would be when decoded from JSON requests, so
+repeated values are separate string objects unless they are interned.
+
+Run from the repository root with ``python -m benchmarks.bench_memory``.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+from models import Education, Experience, Skill
+from storage import ColumnarMemoryStorage, MemoryStorage
+
+
+@dataclass
+class PlainExperience:
+    """
+    Experience as originally defined, without slots or interning.
+    """
+
+    title: str
+    company: str
+    start_date: str
+    end_date: str
+    description: str
+    logo: str
+
+
+@dataclass
+class PlainEducation:
+    """
+    Education as originally defined, without slots or interning.
+    """
+
+    course: str
+    school: str
+    start_date: str
+    end_date: str
+    grade: str
+    logo: str
+
+
+@dataclass
+class PlainSkill:
+    """
+    Skill as originally defined, without slots or interning.
+    """
+
+    name: str
+    proficiency: str
+    logo: str
+
+
+def field_values(section, number):
+    """
+    Returns freshly allocated field values for one record.
+    """
+    # json.loads allocates new strings each time, like request parsing does
+    company = number % 50
+    if section == "experience":
+        return json.loads(
+            json.dumps(
+                [
+                    f"Software Developer {number}",
+                    f"Company {company}",
+                    "October 2022",
+                    "Present",
+                    f"Writing Python code for project {number}",
+                    f"logo-{company}.png",
+                ]
+            )
+        )
+    if section == "education":
+        return json.loads(
+            json.dumps(
+                [
+                    f"Course {number}",
+                    f"University {company}",
+                    "September 2019",
+                    "July 2022",
+                    "80%",
+                    f"logo-{company}.png",
+                ]
+            )
+        )
+    return json.loads(
+        json.dumps([f"Skill {number}", "1-2 Years", f"logo-{company}.png"])
+    )
+
+
+def measure(build, size):
+    """
+    Returns the bytes still allocated after ``build(size)``.
+    """
+    gc.collect()
+    tracemalloc.start()
+    kept = build(size)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def plain_list(section, model):
+    """
+    Returns a builder for a plain list of records, as the original ``data``
+    dict held them.
+    """
+    return lambda size: [model(*field_values(section, n)) for n in range(size)]
+
+
+def storage(section, model, factory):
+    """
+    Returns a builder that fills a storage backend.
+    """
+
+    def build(size):
+        store = factory()
+        for number in range(size):
+            store.add(section, model(*field_values(section, number)))
+        return store
+
+    return build
+
+
+def main():
+    """
+    Prints bytes per record for every representation and section.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sections = {
+        "experience": (PlainExperience, Experience),
+        "education": (PlainEducation, Education),
+        "skill": (PlainSkill, Skill),
+    }
+    print(
+        f"{'section':<11}{'plain list':>14}{'slotted list':>14}"
+        f"{'memory':>14}{'columnar':>14}  bytes/record"
+    )
+    for section, (plain, model) in sections.items():
+        results = [
+            measure(plain_list(section, plain), args.size),
+            measure(plain_list(section, model), args.size),
+            measure(storage(section, model, MemoryStorage), args.size),
+            measure(storage(section, model, ColumnarMemoryStorage), args.size),
+        ]
+        print(
+            f"{section:<11}"
+            + "".join(f"{result / args.size:>14.0f}" for result in results)
+        )
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: the per-request cost of the metrics instrumentation.
+
+Times ``Metrics.observe`` on its own, then a trivial view served through
+the test client of an application with and without ``instrument``. The
+difference is what every request pays for metrics.
+
+Run from the repository root with ``python -m benchmarks.bench_metrics``.
+"""
+
+import argparse
+import timeit
+
+from flask import Flask
+
+from metrics import Metrics, instrument
+
+
+def make_app(metrics=None):
+    """
+    Builds an application with one trivial view, instrumented if
+    ``metrics`` is given.
+    """
+    app = Flask(__name__)
+    app.add_url_rule("/ping", "ping", lambda: "pong")
+    if metrics is not None:
+        instrument(app, metrics)
+    return app
+
+
+def main():
+    """
+    Prints the cost of recording one request and of the request hooks.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    observe = min(
+        timeit.repeat(
+            lambda: metrics.observe("GET", "/resume/skill", 200, 0.0012),
+            number=args.number * 10,
+            repeat=5,
+        )
+    ) / (args.number * 10)
+    print(f"observe              {observe * 1e6:6.2f} us")
+
+    timings = {}
+    for name, app in (("plain", make_app()), ("instrumented", make_app(Metrics()))):
+        client = app.test_client()
+        timings[name] = min(
+            timeit.repeat(
+                lambda client=client: client.get("/ping"),
+                number=args.number,
+                repeat=5,
+            )
+        ) / args.number
+        print(f"request {name:<12} {timings[name] * 1e6:6.2f} us")
+    overhead = timings["instrumented"] - timings["plain"]
+    print(f"overhead per request {overhead * 1e6:6.2f} us")
+
+    metrics.render()
+    render = min(timeit.repeat(metrics.render, number=100, repeat=5)) / 100
+    print(f"render               {render * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: the per-call cost of validating and building a record, with the
+original key-scanning checks versus the compiled validators.
+
+The original path checks ``REQUIRED_FIELDS``, rebuilds the dataclass field
+names and constructs the model from keyword arguments, without checking
+types or lengths. The compiled path does all of that plus the type and
+length checks.
+
+Run from the repository root with ``python -m benchmarks.bench_validation``.
+"""
+
+import argparse
+import timeit
+from dataclasses import fields
+
+from models import MODELS
+from utils import REQUIRED_FIELDS, validate_record
+
+PAYLOADS = {
+    "experience": {
+        "title": "Software Developer",
+        "company": "A Cool Company",
+        "start_date": "October 2022",
+        "end_date": "Present",
+        "description": "Writing Python Code",
+        "logo": "example-logo.png",
+    },
+    "education": {
+        "course": "Computer Science",
+        "school": "University of Tech",
+        "start_date": "September 2019",
+        "end_date": "July 2022",
+        "grade": "80%",
+        "logo": "example-logo.png",
+    },
+    "skill": {"name": "Python", "proficiency": "1-2 Years", "logo": "example-logo.png"},
+}
+
+
+def original(section, data):
+    """
+    Validates and builds a record the way the handlers used to.
+    """
+    if not isinstance(data, dict):
+        return None
+    if [name for name in REQUIRED_FIELDS[section] if name not in data]:
+        return None
+    valid_keys = {f.name for f in fields(MODELS[section])}
+    return MODELS[section](**{k: v for k, v in data.items() if k in valid_keys})
+
+
+def main():
+    """
+    Times both paths for a valid and an invalid payload of every section and
+    prints the cost per call.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for section, payload in PAYLOADS.items():
+        invalid = dict(list(payload.items())[1:])
+        for label, data in (("valid", payload), ("invalid", invalid)):
+            timings = {
+                name: min(
+                    timeit.repeat(
+                        lambda function=function: function(section, data),
+                        number=args.number,
+                        repeat=5,
+                    )
+                )
+                / args.number
+                for name, function in (
+                    ("original", original),
+                    ("compiled", validate_record),
+                )
+            }
+            print(
+                f"{section:<10} {label:<7} "
+                f"original {timings['original'] * 1e6:5.2f} us, "
+                f"compiled {timings['compiled'] * 1e6:5.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+In-process cache of encoded JSON responses.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Keeps the encoded bytes of recent GET responses, bounded by total size.
+
+    Entries are keyed by ``(section, item_id, variant)``, where ``item_id`` is
+    ``None`` for a whole collection and ``variant`` distinguishes
+    representations of the same resource (for example different pages).
+    Each entry remembers the ETag it was built for, so a lookup made with a
+    newer ETag misses even if the write that changed the data happened in
+    another process. Writes seen by this process also ``invalidate`` the
+    affected entries straight away so they do not hold memory.
+
+    When the total size goes over ``max_bytes`` the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, etag, track=True):
+        """
+        Returns the cached ``(body, headers)`` for ``key`` if they were built
+        for ``etag``, otherwise ``None``. With ``track=False`` the lookup is
+        left out of the hit/miss counters.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += track
+                return None
+            self._entries.move_to_end(key)
+            self.hits += track
+            return entry[1], entry[2]
+
+    def put(self, key, etag, body, headers=None):
+        """
+        Stores ``body`` and extra response ``headers`` for ``key`` as built
+        for ``etag``.
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (etag, body, headers or {})
+            self._groups.setdefault(key[:2], set()).add(key)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, section, item_id=None):
+        """
+        Drops every cached representation of a collection and, if
+        ``item_id`` is given, of that record.
+        """
+        with self._lock:
+            for group in {(section, None), (section, item_id)}:
+                for key in list(self._groups.get(group, ())):
+                    self._discard(key)
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self.size = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters and current usage as a dict.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= len(entry[1])
+        group = self._groups[key[:2]]
+        group.discard(key)
+        if not group:
+            del self._groups[key[:2]]
@@ -0,0 +1,41 @@
+"""
+Response compression helpers.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSORS = {"gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+
+# Preferred first when the client accepts several equally
+PREFERENCE = [encoding for encoding in ("br", "gzip") if encoding in COMPRESSORS]
+
+
+def choose_encoding(accept_encodings):
+    """
+    Picks the content coding to use for a response.
+
+    Parameters
+    ----------
+    accept_encodings : werkzeug.datastructures.Accept
+        The parsed Accept-Encoding header of the request.
+
+    Returns
+    -------
+    str or None
+        'br' or 'gzip', or None to send the body uncompressed.
+    """
+    return accept_encodings.best_match(PREFERENCE)
+
+
+def compress(body, encoding):
+    """
+    Compresses ``body`` with the given content coding.
+    """
+    return COMPRESSORS[encoding](body)
@@ -0,0 +1,28 @@
+"""
+Pytest configuration
+"""
+
+import os
+import shutil
+import tempfile
+
+_LOGO_STORE_DIR = None
+
+
+def pytest_configure(config):  # pylint: disable=unused-argument
+    """
+    Keeps the logo blobs written by the tests out of the source tree.
+    """
+    global _LOGO_STORE_DIR  # pylint: disable=global-statement
+    if "LOGO_STORE_DIR" not in os.environ:
+        _LOGO_STORE_DIR = tempfile.mkdtemp(prefix="resume-logos-")
+        os.environ["LOGO_STORE_DIR"] = _LOGO_STORE_DIR
+
+
+def pytest_unconfigure(config):  # pylint: disable=unused-argument
+    """
+    Removes the temporary logo store.
+    """
+    if _LOGO_STORE_DIR is not None:
+        shutil.rmtree(_LOGO_STORE_DIR, ignore_errors=True)
+        del os.environ["LOGO_STORE_DIR"]
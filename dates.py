@@ -0,0 +1,206 @@
+"""
+Sortable keys for the free-text dates of resume records, and an index
+over them.
+"""
+
+import calendar
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from indexing import RecordIndex
+
+# Fields of each section that hold dates
+DATE_FIELDS = {
+    "experience": ("start_date", "end_date"),
+    "education": ("start_date", "end_date"),
+}
+
+# Key of dates that could not be parsed; sorts before every real date
+UNKNOWN = 0
+
+# Key of "Present" and its synonyms; sorts after every real date
+PRESENT = 10**9
+
+PRESENT_WORDS = {"present", "current", "now", "ongoing", "today"}
+
+MONTHS = {}
+for _number in range(1, 13):
+    MONTHS[calendar.month_name[_number].lower()] = _number
+    MONTHS[calendar.month_abbr[_number].lower()] = _number
+MONTHS["sept"] = 9
+
+DATE_PATTERNS = (
+    # "October 2022", "Oct. 2022", "2022"
+    (re.compile(r"^(?:([a-z]+)\.?,?\s+)?(\d{4})$"), "month_year"),
+    # "2022-10", "2022-10-01"
+    (re.compile(r"^(\d{4})-(\d{1,2})(?:-\d{1,2})?$"), "iso"),
+    # "10/2022"
+    (re.compile(r"^(\d{1,2})/(\d{4})$"), "numeric"),
+)
+
+
+def date_key(text, end=False):
+    """
+    Turns a date such as ``"October 2022"`` into a sortable integer key.
+
+    Keys count months (``year * 12 + month``), so they compare in date
+    order. A bare year stands for January, or for December when ``end`` is
+    true, so that as an upper bound ``"2022"`` covers the whole year.
+
+    Parameters
+    ----------
+    text : str
+        The date, as stored in a record or given in a query.
+    end : bool
+        Whether the date is the end of a range.
+
+    Returns
+    -------
+    int
+        The key: ``PRESENT`` for "Present" and its synonyms, ``UNKNOWN`` if
+        the text is not a recognised date.
+    """
+    text = text.strip().lower()
+    if text in PRESENT_WORDS:
+        return PRESENT
+    for pattern, layout in DATE_PATTERNS:
+        match = pattern.match(text)
+        if match is None:
+            continue
+        if layout == "month_year":
+            name, year = match.groups()
+            if name is None:
+                month = 12 if end else 1
+            elif name in MONTHS:
+                month = MONTHS[name]
+            else:
+                return UNKNOWN
+        elif layout == "iso":
+            year, month = match.group(1), int(match.group(2))
+        else:
+            month, year = int(match.group(1)), match.group(2)
+        if 1 <= month <= 12:
+            return int(year) * 12 + month
+    return UNKNOWN
+
+
+class DateIndex(RecordIndex):
+    """
+    Sorted index of the date fields of every dated section.
+
+    Dates are parsed once, when a record is written, and the keys are kept
+    next to the record IDs in one sorted list of ``(key, item_id)`` pairs
+    per field, plus a second set of lists holding only the records whose
+    end date is "Present". Sorting a section is then a slice of a list, and
+    range queries, with or without ``current``, are binary searches,
+    O(log n + k) for k results.
+    """
+
+    sections = tuple(DATE_FIELDS)
+
+    def __init__(self):
+        self._keys = {section: {} for section in DATE_FIELDS}
+        self._sorted = {
+            section: {name: [] for name in names}
+            for section, names in DATE_FIELDS.items()
+        }
+        self._current = {
+            section: {name: [] for name in names}
+            for section, names in DATE_FIELDS.items()
+        }
+        self._lock = threading.Lock()
+
+    def update(self, section, item_id, item):
+        if section not in DATE_FIELDS:
+            return
+        names = DATE_FIELDS[section]
+        keys = None
+        if item is not None:
+            keys = tuple(date_key(getattr(item, name)) for name in names)
+        with self._lock:
+            old = self._keys[section].pop(item_id, None)
+            if old is not None:
+                for columns in self._columns(section, old):
+                    for name, key in zip(names, old):
+                        column = columns[name]
+                        del column[bisect_left(column, (key, item_id))]
+            if keys is not None:
+                self._keys[section][item_id] = keys
+                for columns in self._columns(section, keys):
+                    for name, key in zip(names, keys):
+                        insort(columns[name], (key, item_id))
+
+    def reset(self, section):
+        if section not in DATE_FIELDS:
+            return
+        with self._lock:
+            self._keys[section].clear()
+            for name in DATE_FIELDS[section]:
+                self._sorted[section][name].clear()
+                self._current[section][name].clear()
+
+    def _columns(self, section, keys):
+        # The sorted lists a record with these keys belongs in
+        if keys[DATE_FIELDS[section].index("end_date")] == PRESENT:
+            return self._sorted[section], self._current[section]
+        return (self._sorted[section],)
+
+    def query(
+        self,
+        section,
+        field="start_date",
+        descending=False,
+        lower=None,
+        upper=None,
+        current=False,
+        after=None,
+        limit=None,
+    ):
+        """
+        Returns records of a section ordered by one of its date fields.
+
+        Parameters
+        ----------
+        section : str
+            A section listed in ``DATE_FIELDS``.
+        field : str
+            The date field to order and filter by.
+        descending : bool
+            Whether the latest dates come first.
+        lower, upper : int, optional
+            Inclusive bounds on the key of ``field``. Records whose date is
+            not recognised are left out when either bound is given.
+        current : bool
+            Only return records whose end date is "Present".
+        after : tuple, optional
+            The ``(key, item_id)`` pair of the last record of the previous
+            page, as returned by this method.
+        limit : int, optional
+            The maximum number of records to return.
+
+        Returns
+        -------
+        list of tuple
+            ``(key, item_id)`` pairs in the requested order.
+        """
+        self.refresh()
+        with self._lock:
+            entries = (self._current if current else self._sorted)[section][field]
+
+            low, high = 0, len(entries)
+            if lower is not None or upper is not None:
+                lower = UNKNOWN + 1 if lower is None else lower
+                low = bisect_left(entries, (lower, -1))
+            if upper is not None:
+                high = bisect_right(entries, (upper, float("inf")))
+
+            if descending:
+                if after is not None:
+                    high = min(high, bisect_left(entries, after))
+                start = low if limit is None else max(low, high - limit)
+                return entries[start:high][::-1]
+            if after is not None:
+                low = max(low, bisect_right(entries, after))
+            stop = high if limit is None else min(high, low + limit)
+            return entries[low:stop]
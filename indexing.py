@@ -0,0 +1,112 @@
+"""
+Base class of the in-memory structures derived from stored records.
+"""
+
+import threading
+
+from models import MODELS
+
+
+class RecordIndex:
+    """
+    Structure derived from the records of a store (a search index, sorted
+    date keys, rendered fragments) and kept up to date one record at a time.
+
+    ``update`` has the same signature as a storage listener, so once
+    ``follow`` has subscribed it a write costs the index one record, however
+    many records there are. Subclasses implement ``update`` and ``reset``,
+    may narrow ``sections``, and call ``refresh`` before reading.
+
+    A store whose ``notifies_all_writes`` is false (``SQLiteStorage``) can be
+    written by other processes without telling this one. The index then
+    also keeps the version of each section it reflects, and ``refresh``
+    rebuilds a section whose version has moved without a notification.
+    """
+
+    # Sections whose records the index holds
+    sections = tuple(MODELS)
+
+    # Store followed for other processes' writes, and the section versions
+    # the index reflects; unused for stores that report every write
+    _store = None
+    _versions = None
+    _refresh_lock = None
+
+    def build(self, store):
+        """
+        Indexes every record currently in ``store``.
+        """
+        for section in self.sections:
+            for item_id, item in store.snapshot(section):
+                self.update(section, item_id, item)
+
+    def follow(self, store):
+        """
+        Indexes every record currently in ``store``, then follows its writes.
+        """
+        if store.notifies_all_writes:
+            self.build(store)
+            store.subscribe(self.update)
+            return
+        self._store = store
+        self._versions = {}
+        self._refresh_lock = threading.Lock()
+        with self._refresh_lock:
+            for section in self.sections:
+                self._rebuild(section)
+        store.subscribe(self._follow)
+
+    def refresh(self):
+        """
+        Rebuilds the sections other processes have written to since they
+        were last indexed.
+        """
+        if self._store is None:
+            return
+        stale = [
+            section
+            for section in self.sections
+            if self._store.version(section) != self._versions[section]
+        ]
+        if not stale:
+            return
+        with self._refresh_lock:
+            for section in stale:
+                # Another thread may have rebuilt it while this one waited
+                if self._store.version(section) != self._versions[section]:
+                    self._rebuild(section)
+
+    def update(self, section, item_id, item):
+        """
+        Indexes a record, replacing any previous version of it. A ``None``
+        item removes the record.
+        """
+        raise NotImplementedError
+
+    def reset(self, section):
+        """
+        Forgets every record of ``section``.
+        """
+        raise NotImplementedError
+
+    def _follow(self, section, item_id, item):
+        with self._refresh_lock:
+            self.update(section, item_id, item)
+            if section not in self._versions:
+                return
+            # A write made here bumps the section version by one (a batch by
+            # one in all); anything more means another process wrote too.
+            version = self._store.version(section)
+            if version - self._versions[section] > 1:
+                self._rebuild(section)
+            else:
+                self._versions[section] = version
+
+    def _rebuild(self, section):
+        # The version is read first: a write landing during the snapshot
+        # leaves it behind the contents, which only costs another rebuild.
+        version = self._store.version(section)
+        self.reset(section)
+        for item_id, item in self._store.snapshot(section):
+            self.update(section, item_id, item)
+        self._versions[section] = version
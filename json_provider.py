@@ -0,0 +1,93 @@
+"""
+JSON provider with a fast path for the resume models.
+"""
+
+from dataclasses import fields
+from functools import lru_cache
+from operator import attrgetter
+
+from flask.json.provider import DefaultJSONProvider
+
+from models import MODELS
+
+
+def make_encoder(model, names=None):
+    """
+    Builds a function that turns a model instance into a dict.
+
+    Parameters
+    ----------
+    model : type
+        The dataclass to encode.
+    names : sequence of str, optional
+        The fields to include, in output order. Defaults to every field of
+        the dataclass, in definition order.
+
+    Returns
+    -------
+    callable
+        ``encode(obj) -> dict`` with one key per field.
+    """
+    names = tuple(names or (f.name for f in fields(model)))
+    if len(names) == 1:
+        name = names[0]
+        return lambda obj: {name: getattr(obj, name)}
+    getter = attrgetter(*names)
+    return lambda obj: dict(zip(names, getter(obj)))
+
+
+@lru_cache(maxsize=256)
+def projection_encoder(model, names):
+    """
+    Returns a cached encoder that only writes the given fields of ``model``.
+
+    Parameters
+    ----------
+    model : type
+        The dataclass to encode.
+    names : tuple of str
+        The fields to include, in output order.
+
+    Returns
+    -------
+    callable
+        ``encode(obj) -> dict`` with only the requested keys.
+    """
+    return make_encoder(model, names)
+
+
+class ResumeJSONProvider(DefaultJSONProvider):
+    """
+    Serializes ``Experience``, ``Education`` and ``Skill`` without reflection.
+
+    Flask's default provider hands every dataclass to
+    ``dataclasses.asdict``, which walks and deep-copies the fields on each
+    call. This provider builds one field-order encoder per model up front
+    and converts records (and lists of records) with it before handing the
+    result to the C JSON encoder. Any other type falls back to the default
+    behaviour.
+
+    Keys are written in field order rather than sorted.
+    """
+
+    sort_keys = False
+    encoders = {model: make_encoder(model) for model in MODELS.values()}
+
+    def dumps(self, obj, **kwargs):
+        encoders = self.encoders
+        encoder = encoders.get(type(obj))
+        if encoder is not None:
+            obj = encoder(obj)
+        elif type(obj) is list and obj:
+            # Records in one section share a type, so look the encoder up once
+            model = type(obj[0])
+            encoder = encoders.get(model)
+            if encoder is not None:
+                obj = [encoder(item) if type(item) is model else item for item in obj]
+        return super().dumps(obj, **kwargs)
+
+    def default(self, o):
+        encoder = self.encoders.get(type(o))
+        if encoder is not None:
+            return encoder(o)
+        return super().default(o)
@@ -0,0 +1,175 @@
+"""
+Content-addressed storage for logo images.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+LOGO_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"}
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class LogoTooLarge(ValueError):
+    """
+    Raised when an uploaded logo is bigger than allowed.
+    """
+
+
+class LogoStore:
+    """
+    Stores logo files under the SHA-256 digest of their content.
+
+    A blob lives at ``<root>/<digest[:2]>/<digest><ext>``, so identical
+    images are stored once and a digest always names the same bytes. That
+    is what lets clients cache logo URLs forever. The extension is the one
+    the image was stored with, and a blob is only found under that
+    extension, so its served media type cannot be changed by asking for a
+    different one. ``names`` maps the original file names (as used in the
+    ``logo`` field of records) to digests.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.names = {}
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest, extension):
+        """
+        Returns the file path of a blob stored with ``extension``, or None if
+        there is no such blob.
+        """
+        if not DIGEST_PATTERN.match(digest) or extension not in LOGO_EXTENSIONS:
+            return None
+        path = os.path.join(self.root, digest[:2], digest + extension)
+        return path if os.path.isfile(path) else None
+
+    def digest_of(self, reference):
+        """
+        Returns the digest a ``logo`` field refers to, either as
+        ``<digest><ext>`` or as a known original file name, or None.
+        """
+        digest = os.path.splitext(reference)[0]
+        if DIGEST_PATTERN.match(digest):
+            return digest
+        return self.names.get(reference)
+
+    def put(self, stream, extension, chunk_size=64 * 1024, max_size=None):
+        """
+        Stores the content of a binary stream as an ``extension`` image and
+        returns its digest.
+
+        The content is hashed while it is written to a temporary file, which
+        is then renamed into place, or discarded if the blob already exists,
+        so each distinct image is stored once. Raises ``LogoTooLarge`` if the
+        stream holds more than ``max_size`` bytes.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        handle, temporary = tempfile.mkstemp(dir=self.root, suffix=".upload")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                while chunk := stream.read(chunk_size):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise LogoTooLarge(max_size)
+                    digest.update(chunk)
+                    output.write(chunk)
+            digest = digest.hexdigest()
+            path = os.path.join(self.root, digest[:2], digest + extension)
+            if os.path.isfile(path):
+                # Refresh the timestamp so the collector's grace period
+                # protects a re-upload that is about to be referenced.
+                os.utime(path)
+            else:
+                # mkstemp creates files readable by their owner only, which
+                # would stop a front-end proxy serving them with X-Sendfile.
+                os.chmod(temporary, 0o644)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return digest
+
+    def import_directory(self, directory):
+        """
+        Stores every image file found directly in ``directory`` and records
+        its name in ``names``.
+        """
+        for name in sorted(os.listdir(directory)):
+            source = os.path.join(directory, name)
+            extension = os.path.splitext(name)[1].lower()
+            if extension in LOGO_EXTENSIONS and os.path.isfile(source):
+                with open(source, "rb") as stream:
+                    self.names[name] = self.put(stream, extension)
+
+    def collect(self, referenced, grace=3600):
+        """
+        Deletes blobs that no record refers to.
+
+        Blobs imported from the source directory are always kept, and so is
+        anything written in the last ``grace`` seconds, so a logo uploaded
+        just before the record that uses it is created survives.
+
+        Parameters
+        ----------
+        referenced : set of str
+            Digests in use.
+        grace : float
+            Minimum age in seconds of a blob before it can be deleted.
+
+        Returns
+        -------
+        int
+            The number of blobs deleted.
+        """
+        keep = set(referenced) | set(self.names.values())
+        cutoff = time.time() - grace
+        deleted = 0
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                digest = os.path.splitext(name)[0]
+                if digest in keep or os.path.getmtime(path) > cutoff:
+                    continue
+                try:
+                    os.remove(path)
+                    deleted += 1
+                except FileNotFoundError:
+                    pass
+        return deleted
+
+    def start_collector(self, referenced, interval, grace=3600):
+        """
+        Runs ``collect`` every ``interval`` seconds on a daemon thread.
+
+        Parameters
+        ----------
+        referenced : callable
+            Returns the set of digests in use when called.
+        interval : float
+            Seconds between collections.
+        grace : float
+            Passed on to ``collect``.
+
+        Returns
+        -------
+        threading.Event
+            Set it to stop the collector.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                self.collect(referenced(), grace)
+
+        threading.Thread(target=run, name="logo-collector", daemon=True).start()
+        return stop
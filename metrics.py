@@ -0,0 +1,179 @@
+"""
+Request metrics in the Prometheus text exposition format.
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from flask import request
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _labels(names, values):
+    pairs = ",".join(
+        f'{name}="{str(value).translate(_ESCAPES)}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Metrics:
+    """
+    Request counters, latency histograms and gauges.
+
+    ``observe`` is the only call on the request path: it bumps one counter
+    and one histogram bucket under a lock, so it costs about a microsecond.
+    Cumulative bucket counts and gauge values are worked out when the
+    metrics are rendered, not when requests are recorded.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of every metric name.
+    buckets : tuple of float
+        Upper bounds of the latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, prefix="resume", buckets=LATENCY_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._requests = {}
+        self._latencies = {}
+        self._gauges = []
+        self._lock = threading.Lock()
+
+    def observe(self, method, route, status, seconds):
+        """
+        Records one request.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        route : str
+            The URL rule that matched, such as ``/resume/skill/<int:index>``.
+        status : int
+            The response status code.
+        seconds : float
+            How long the request took.
+        """
+        key = (method, route, status)
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latencies.get(key[:2])
+            if histogram is None:
+                # One count per bucket, one for +Inf, then the sum
+                histogram = [0] * (len(self.buckets) + 1) + [0.0]
+                self._latencies[key[:2]] = histogram
+            histogram[bisect_left(self.buckets, seconds)] += 1
+            histogram[-1] += seconds
+
+    def gauge(self, name, documentation, collect, labels=(), kind="gauge"):
+        """
+        Registers a value that is read when the metrics are rendered.
+
+        Parameters
+        ----------
+        name : str
+            The metric name, without the prefix.
+        documentation : str
+            The ``# HELP`` text.
+        collect : callable
+            Returns a list of ``(label_values, value)`` pairs, or a single
+            number when ``labels`` is empty.
+        labels : tuple of str
+            The label names.
+        kind : str
+            The Prometheus type, ``gauge`` or ``counter``.
+        """
+        self._gauges.append((name, documentation, collect, tuple(labels), kind))
+
+    def reset(self):
+        """
+        Forgets every recorded request.
+        """
+        with self._lock:
+            self._requests.clear()
+            self._latencies.clear()
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text format.
+        """
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latencies = sorted(
+                (key, list(histogram)) for key, histogram in self._latencies.items()
+            )
+        name = f"{self.prefix}_http_requests_total"
+        lines = [
+            f"# HELP {name} HTTP requests by method, route and status.",
+            f"# TYPE {name} counter",
+        ]
+        names = ("method", "route", "status")
+        lines += [f"{name}{_labels(names, key)} {count}" for key, count in requests]
+
+        name = f"{self.prefix}_http_request_duration_seconds"
+        lines += [
+            f"# HELP {name} HTTP request latency by method and route.",
+            f"# TYPE {name} histogram",
+        ]
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for (method, route), histogram in latencies:
+            total = 0
+            for bound, count in zip(bounds, histogram):
+                total += count
+                labels = _labels(("method", "route", "le"), (method, route, bound))
+                lines.append(f"{name}_bucket{labels} {total}")
+            labels = _labels(("method", "route"), (method, route))
+            lines.append(f"{name}_sum{labels} {histogram[-1]!r}")
+            lines.append(f"{name}_count{labels} {total}")
+
+        for suffix, documentation, collect, labels, kind in self._gauges:
+            name = f"{self.prefix}_{suffix}"
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            samples = collect()
+            if not labels:
+                samples = [((), samples)]
+            lines += [
+                f"{name}{_labels(labels, key)} {value!r}" for key, value in samples
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def instrument(app, metrics):
+    """
+    Records every request ``app`` handles in ``metrics`` while its
+    ``METRICS_ENABLED`` setting is true (the default), so recording can be
+    switched off at runtime.
+
+    Requests are labelled with the URL rule that matched rather than the
+    path, so ``/resume/skill/1`` and ``/resume/skill/2`` share a series.
+    For streamed responses the latency covers building the response, not
+    sending all of its body.
+    """
+
+    @app.before_request
+    def start_timer():
+        if app.config.get("METRICS_ENABLED", True):
+            request.environ["metrics.start"] = perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = request.environ.get("metrics.start")
+        if start is not None:
+            rule = request.url_rule
+            metrics.observe(
+                request.method,
+                rule.rule if rule is not None else "unmatched",
+                response.status_code,
+                perf_counter() - start,
+            )
+        return response
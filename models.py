@@ -2,17 +2,35 @@
 
 """
 Models for the Resume API. Each class is related to
+
+Models are slotted and frozen: records carry no per-instance ``__dict__``
+and are replaced rather than modified. Fields listed in ``INTERNED`` repeat
+across many records (logos, companies, dates, ...) and are interned, so
+each distinct value is stored once however many records use it.
 """
 
+import sys
 from dataclasses import dataclass
 
 
-@dataclass
+def intern_fields(obj):
+    """
+    Interns the string values of ``obj``'s low-cardinality fields.
+    """
+    for name in type(obj).INTERNED:
+        value = getattr(obj, name)
+        if type(value) is str:
+            object.__setattr__(obj, name, sys.intern(value))
+
+
+@dataclass(frozen=True, slots=True)
 class Experience:
     """
     Experience Class
     """
 
+    INTERNED = ("company", "start_date", "end_date", "logo")
+
     title: str
     company: str
     start_date: str
@@ -20,13 +38,18 @@ class Experience:
     description: str
     logo: str
 
+    def __post_init__(self):
+        intern_fields(self)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Education:
     """
     Education Class
     """
 
+    INTERNED = ("school", "start_date", "end_date", "grade", "logo")
+
     course: str
     school: str
     start_date: str
@@ -34,13 +57,28 @@ class Education:
     grade: str
     logo: str
 
+    def __post_init__(self):
+        intern_fields(self)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Skill:
     """
     Skill Class
     """
 
+    INTERNED = ("proficiency", "logo")
+
     name: str
     proficiency: str
     logo: str
+
+    def __post_init__(self):
+        intern_fields(self)
+
+
+MODELS = {
+    "experience": Experience,
+    "education": Education,
+    "skill": Skill,
+}
@@ -0,0 +1,255 @@
+"""
+On-demand request profiling and continuous stack sampling.
+"""
+
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import sys
+import threading
+from collections import Counter, deque
+from time import perf_counter
+
+from flask import g, request
+
+
+class RequestProfiler:
+    """
+    Runs cProfile around single requests and keeps the most recent results.
+
+    Only one request is profiled at a time: since Python 3.12 cProfile hooks
+    into ``sys.monitoring``, which is process-wide, so a second profiler
+    cannot start while one is running, and calls made by other threads during
+    the request show up in its profile. A request that asks to be profiled
+    while another one is being profiled is served normally.
+
+    Parameters
+    ----------
+    keep : int
+        How many profiles to keep in memory.
+    directory : str, optional
+        If given, every profile is also written there as ``<id>.prof``,
+        readable with ``pstats`` or tools such as snakeviz.
+    """
+
+    def __init__(self, keep=20, directory=None):
+        self.directory = directory
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """
+        Starts a profiler, or returns None if one is already running.
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another tool (a debugger or coverage) owns sys.monitoring
+            self._busy.release()
+            return None
+        return profile
+
+    def finish(self, profile, method, path, seconds):
+        """
+        Stops ``profile``, stores its stats and returns their ID.
+        """
+        profile.disable()
+        self._busy.release()
+        profile.create_stats()
+        data = marshal.dumps(profile.stats)
+        profile_id = str(next(self._ids))
+        summary = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "seconds": seconds,
+        }
+        with self._lock:
+            self._profiles.append((summary, data))
+        if self.directory is not None:
+            with open(os.path.join(self.directory, f"{profile_id}.prof"), "wb") as out:
+                out.write(data)
+        return profile_id
+
+    def list(self):
+        """
+        Returns a summary of every kept profile, most recent first.
+        """
+        with self._lock:
+            return [summary for summary, _ in reversed(self._profiles)]
+
+    def get(self, profile_id):
+        """
+        Returns the marshalled stats of a profile (the ``.prof`` format), or
+        None if it is not kept any more.
+        """
+        with self._lock:
+            for summary, data in self._profiles:
+                if summary["id"] == profile_id:
+                    return data
+        return None
+
+    def report(self, profile_id, sort="cumulative", limit=50):
+        """
+        Returns the ``pstats`` text report of a profile, or None.
+        """
+        data = self.get(profile_id)
+        if data is None:
+            return None
+        stats = pstats.Stats(_LoadedProfile(marshal.loads(data)), stream=io.StringIO())
+        stats.sort_stats(sort).print_stats(limit)
+        return stats.stream.getvalue()
+
+
+class _LoadedProfile:
+    """
+    Stats holder accepted by ``pstats.Stats`` in place of a profiler.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profile_requests(app, profiler):
+    """
+    Profiles the requests ``app`` handles that carry the profiling header.
+
+    Profiling happens only while ``PROFILING_ENABLED`` is set and the request
+    has a ``PROFILE_HEADER`` header, so it can be switched on at runtime. The
+    response of a profiled request carries the profile ID in an
+    ``X-Profile-Id`` header. For streamed responses the profile covers
+    building the response, not sending all of its body. The profile of a
+    request that raises is still stored, without the header, when the
+    request is torn down.
+    """
+
+    @app.before_request
+    def start_profile():
+        enabled = app.config["PROFILING_ENABLED"]
+        if enabled and app.config["PROFILE_HEADER"] in request.headers:
+            g.profile_start = perf_counter()
+            g.profile = profiler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop("profile", None)
+        if profile is not None:
+            response.headers["X-Profile-Id"] = profiler.finish(
+                profile,
+                request.method,
+                request.path,
+                perf_counter() - g.profile_start,
+            )
+        elif "profile_start" in g:
+            response.headers["X-Profile-Id"] = "busy"
+        return response
+
+    @app.teardown_request
+    def release_profile(error=None):
+        # after_request is skipped when the request raises; without this the
+        # profiler would stay busy and no later request could be profiled.
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profiler.finish(
+                profile,
+                request.method,
+                request.path,
+                perf_counter() - g.profile_start,
+            )
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread at a fixed interval.
+
+    Each sample adds one count to every thread's current stack, so over time
+    the counts show where threads spend their time, including in C calls
+    and I/O that cProfile attributes poorly. Stacks are rendered in the
+    collapsed ``frame;frame;frame count`` format read by flamegraph.pl,
+    speedscope and similar tools. Sampling costs nothing on the request
+    path; the sampler thread itself pays for walking the frames.
+
+    Parameters
+    ----------
+    interval : float
+        Seconds between samples.
+    max_depth : int
+        Frames kept per stack, counted from the innermost one.
+    """
+
+    def __init__(self, interval=0.01, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """
+        Records the current stack of every thread except the caller.
+        """
+        current = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                code = frame.f_code
+                frames.append(
+                    f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+                )
+                frame = frame.f_back
+            frames.append(names.get(ident, str(ident)))
+            stacks.append(";".join(reversed(frames)))
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += 1
+
+    def collapsed(self):
+        """
+        Returns the aggregated stacks in the collapsed flamegraph format.
+        """
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def reset(self):
+        """
+        Forgets every sample.
+        """
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def start(self):
+        """
+        Samples every ``interval`` seconds on a daemon thread.
+
+        Returns
+        -------
+        threading.Event
+            Set it to stop the sampler.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.interval):
+                self.sample()
+
+        threading.Thread(target=run, name="stack-sampler", daemon=True).start()
+        return stop
@@ -0,0 +1,166 @@
+"""
+HTML and Markdown documents of the resume, rendered one record at a time.
+"""
+
+import html
+import re
+import threading
+from dataclasses import fields
+from urllib.parse import quote
+
+from indexing import RecordIndex
+from models import MODELS
+
+SECTION_TITLES = {
+    "experience": "Experience",
+    "education": "Education",
+    "skill": "Skills",
+}
+
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>#|])")
+
+
+def _md(text):
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+def _logo_url(name):
+    return "/logos/" + quote(name)
+
+
+def _values(item):
+    return {field.name: getattr(item, field.name) for field in fields(item)}
+
+
+def render_html(section, item):
+    """
+    Returns the HTML fragment of one record.
+    """
+    e = {name: html.escape(value) for name, value in _values(item).items()}
+    if section == "skill":
+        return f"<li>{e['name']} <small>{e['proficiency']}</small></li>\n"
+    logo = html.escape(_logo_url(item.logo))
+    if section == "experience":
+        heading, place, details = e["title"], e["company"], e["description"]
+    else:
+        heading, place, details = e["course"], e["school"], f"Grade: {e['grade']}"
+    return (
+        f'<article class="{section}">'
+        f'<img src="{logo}" alt="" width="48" height="48">'
+        f"<h3>{heading}</h3>"
+        f"<p>{place} &middot; {e['start_date']} &ndash; {e['end_date']}</p>"
+        f"<p>{details}</p></article>\n"
+    )
+
+
+def render_markdown(section, item):
+    """
+    Returns the Markdown fragment of one record.
+    """
+    e = {name: _md(value) for name, value in _values(item).items()}
+    if section == "skill":
+        return f"- {e['name']} ({e['proficiency']})\n"
+    if section == "experience":
+        heading, place, details = e["title"], e["company"], e["description"]
+    else:
+        heading, place, details = e["course"], e["school"], f"Grade: {e['grade']}"
+    return (
+        f"### {heading}\n\n"
+        f"*{place}* | {e['start_date']} - {e['end_date']}\n\n"
+        f"{details}\n\n"
+    )
+
+
+def _stitch_html(sections):
+    body = []
+    for section, fragments in sections:
+        if section == "skill":
+            fragments = f"<ul>\n{fragments}</ul>\n"
+        body.append(
+            f'<section id="{section}">\n<h2>{SECTION_TITLES[section]}</h2>\n'
+            f"{fragments}</section>\n"
+        )
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        "<title>Resume</title>\n</head>\n<body>\n<h1>Resume</h1>\n"
+        + "".join(body)
+        + "</body>\n</html>\n"
+    )
+
+
+def _stitch_markdown(sections):
+    return "# Resume\n\n" + "".join(
+        f"## {SECTION_TITLES[section]}\n\n{fragments}\n"
+        for section, fragments in sections
+    )
+
+
+# Format name -> (media type, record renderer, document stitcher)
+FORMATS = {
+    "html": ("text/html", render_html, _stitch_html),
+    "md": ("text/markdown", render_markdown, _stitch_markdown),
+}
+
+
+class DocumentRenderer(RecordIndex):
+    """
+    Keeps the rendered fragment of every record in every format, and the
+    documents stitched from them.
+
+    ``update`` renders just the record that was written and drops the joined
+    fragments of its section and the stitched documents. The next view joins
+    the fragments of that one section and reuses the others; every view
+    after that returns the same string until the next write.
+    """
+
+    def __init__(self):
+        self._fragments = {
+            name: {section: {} for section in MODELS} for name in FORMATS
+        }
+        self._joined = {name: dict.fromkeys(MODELS) for name in FORMATS}
+        self._documents = dict.fromkeys(FORMATS)
+        self._lock = threading.Lock()
+
+    def update(self, section, item_id, item):
+        rendered = {}
+        if item is not None:
+            rendered = {
+                name: render(section, item)
+                for name, (_, render, _) in FORMATS.items()
+            }
+        with self._lock:
+            for name, fragments in self._fragments.items():
+                if item is None:
+                    fragments[section].pop(item_id, None)
+                else:
+                    fragments[section][item_id] = rendered[name]
+                self._joined[name][section] = None
+            self._documents = dict.fromkeys(FORMATS)
+
+    def reset(self, section):
+        with self._lock:
+            for name, fragments in self._fragments.items():
+                fragments[section].clear()
+                self._joined[name][section] = None
+            self._documents = dict.fromkeys(FORMATS)
+
+    def document(self, name):
+        """
+        Returns the whole resume in format ``name`` (a key of ``FORMATS``).
+        """
+        self.refresh()
+        document = self._documents[name]
+        if document is not None:
+            return document
+        with self._lock:
+            document = self._documents[name]
+            if document is None:
+                joined = self._joined[name]
+                for section, fragments in self._fragments[name].items():
+                    if joined[section] is None:
+                        joined[section] = "".join(
+                            fragments[key] for key in sorted(fragments)
+                        )
+                document = FORMATS[name][2](joined.items())
+                self._documents[name] = document
+        return document
@@ -0,0 +1,141 @@
+"""
+In-memory full-text search over resume records.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+from indexing import RecordIndex
+
+# Fields of each section that are searchable
+SEARCH_FIELDS = {
+    "experience": ["title", "company", "description"],
+    "education": ["course", "school"],
+    "skill": ["name"],
+}
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens.
+
+    Parameters
+    ----------
+    text : str
+        The text to split.
+
+    Returns
+    -------
+    list of str
+        The tokens, in order of appearance.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex(RecordIndex):
+    """
+    Inverted index over the searchable fields of every section, ranked with
+    BM25.
+
+    Documents are keyed by ``(section, item_id)``. A query only touches the
+    postings of its own terms.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._documents = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def update(self, section, item_id, item):
+        if item is None:
+            self.remove(section, item_id)
+            return
+        terms = Counter(
+            token
+            for name in SEARCH_FIELDS[section]
+            for token in tokenize(getattr(item, name))
+        )
+        key = (section, item_id)
+        with self._lock:
+            self._remove(key)
+            self._documents[key] = terms
+            self._lengths[key] = sum(terms.values())
+            self._total_length += self._lengths[key]
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[key] = frequency
+
+    def reset(self, section):
+        with self._lock:
+            for key in [key for key in self._documents if key[0] == section]:
+                self._remove(key)
+
+    def remove(self, section, item_id):
+        """
+        Removes a record from the index.
+        """
+        with self._lock:
+            self._remove((section, item_id))
+
+    def search(self, query, limit=10, section=None):
+        """
+        Returns the records that best match ``query``.
+
+        Parameters
+        ----------
+        query : str
+            Free text; every token is a search term.
+        limit : int
+            The maximum number of results.
+        section : str, optional
+            Only return records of this section.
+
+        Returns
+        -------
+        list of tuple
+            ``(score, section, item_id)`` tuples, best match first.
+        """
+        self.refresh()
+        terms = set(tokenize(query))
+        scores = {}
+        with self._lock:
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                found = len(postings)
+                idf = math.log(1 + (count - found + 0.5) / (found + 0.5))
+                for key, frequency in postings.items():
+                    if section is not None and key[0] != section:
+                        continue
+                    length = self._lengths[key] / average_length
+                    norm = self.k1 * (1 - self.b + self.b * length)
+                    score = idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    scores[key] = scores.get(key, 0.0) + score
+        ranked = heapq.nsmallest(
+            limit, scores.items(), key=lambda entry: (-entry[1], entry[0])
+        )
+        return [(score, key[0], key[1]) for key, score in ranked]
+
+    def _remove(self, key):
+        terms = self._documents.pop(key, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(key)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
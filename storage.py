@@ -0,0 +1,1096 @@
+"""
+Storage backends for the Resume API.
+
+The Flask handlers never touch Python lists directly; they go through a
+``Storage`` object. ``MemoryStorage`` keeps everything in process memory,
+``DurableMemoryStorage`` adds a write-ahead log so it survives restarts,
+and ``SQLiteStorage`` keeps it in an on-disk SQLite database in WAL mode so
+several worker processes can share one resume store. ``ReplicatedStorage``
+serves each of those processes from its own in-memory copy of the database.
+"""
+
+import sqlite3
+import threading
+import time
+from array import array
+import uuid
+from bisect import bisect_left, bisect_right
+from dataclasses import astuple, fields
+from operator import attrgetter
+from urllib.parse import parse_qsl
+
+from models import MODELS
+from wal import WriteAheadLog
+
+
+class Storage:
+    """
+    Interface shared by every storage backend.
+
+    Records are addressed by section name (``'experience'``, ``'education'``
+    or ``'skill'``) and by a stable integer ID. IDs are assigned in
+    increasing order when a record is added and are never reused, so an ID
+    stays valid for as long as its record exists.
+
+    Other components (caches, indexes) can ``subscribe`` to be told about
+    every write made through this object.
+    """
+
+    # False if other processes can write the same records without the
+    # listeners of this object hearing about it
+    notifies_all_writes = True
+
+    def __init__(self):
+        self._listeners = []
+
+    def subscribe(self, listener):
+        """
+        Registers ``listener(section, item_id, item)`` to be called after
+        every add, update or delete. ``item`` is ``None`` for deletes.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, section, item_id, item):
+        for listener in self._listeners:
+            listener(section, item_id, item)
+
+    def all(self, section):
+        """
+        Returns every record of a section, ordered by ID.
+        """
+        raise NotImplementedError
+
+    def page(self, section, after=None, limit=None):
+        """
+        Returns up to ``limit`` ``(item_id, record)`` pairs with IDs greater
+        than ``after``, ordered by ID. The cost depends on ``limit``, not on
+        the size of the section.
+        """
+        raise NotImplementedError
+
+    def snapshot(self, section):
+        """
+        Returns an iterator of ``(item_id, record)`` pairs, ordered by ID,
+        reflecting the section at the moment of the call. Writes made while
+        the iterator is consumed do not show up in it.
+        """
+        raise NotImplementedError
+
+    def get(self, section, item_id):
+        """
+        Returns the record with ``item_id`` or ``None`` if there is none.
+        """
+        raise NotImplementedError
+
+    def add(self, section, item):
+        """
+        Stores a record and returns its new ID.
+        """
+        raise NotImplementedError
+
+    def add_many(self, section, items):
+        """
+        Stores several records at once and returns their new IDs in order.
+        """
+        return [self.add(section, item) for item in items]
+
+    def update(self, section, item_id, item):
+        """
+        Replaces the record with ``item_id``. Returns ``False`` if there is none.
+        """
+        raise NotImplementedError
+
+    def delete(self, section, item_id):
+        """
+        Removes the record with ``item_id``. Returns ``False`` if there is none.
+        """
+        raise NotImplementedError
+
+    def count(self, section):
+        """
+        Returns the number of records in a section.
+        """
+        raise NotImplementedError
+
+    def version(self, section, item_id=None):
+        """
+        Returns the version counter of a section, or of one record if
+        ``item_id`` is given (``None`` if there is no such record).
+
+        Every add, update and delete bumps the section counter; a record's
+        version is the section counter at its last write. Together with the
+        store's ``epoch`` token, which is new for every fresh store, the
+        counters identify a representation exactly and can be used as ETags.
+        """
+        raise NotImplementedError
+
+    def seed(self, defaults):
+        """
+        Adds ``defaults`` (a dict of section -> list of records) if the store
+        is completely empty.
+        """
+        if any(self.count(section) for section in MODELS):
+            return
+        for section, items in defaults.items():
+            for item in items:
+                self.add(section, item)
+
+
+class _Snapshot:
+    """
+    Immutable view of one section: sorted IDs and the matching records.
+    """
+
+    __slots__ = ("ids", "items")
+
+    def __init__(self, ids, items):
+        self.ids = ids
+        self.items = items
+
+
+class MemoryStorage(Storage):
+    """
+    Keeps records in process memory. Nothing survives a restart and every
+    process has its own copy.
+
+    Each section has a dict mapping ID to ``(record, version)``, for
+    constant-time lookup, update and delete, and an ordered list of IDs.
+    Because IDs only grow, dict insertion order is ID order and the list
+    stays sorted by appending. ``page`` bisects the list, so its cost
+    depends on the page size, not on the size of the section. Deleted IDs
+    are left in the list and skipped; the list is compacted once more than
+    half of it is stale, which keeps deletes amortised O(1).
+
+    The store is safe to share between threads. Writers serialize on one
+    lock. Readers never lock to look up a record or read a page: the list
+    is only appended to or replaced whole. ``all`` and ``snapshot`` use an
+    immutable ``_Snapshot`` of the section: a write only marks it stale,
+    and the first of them after that copies the dict once. Later readers
+    share the copy until the next write.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.epoch = uuid.uuid4().hex
+        self._records = {section: {} for section in MODELS}
+        self._order = {section: [] for section in MODELS}
+        self._snapshots = dict.fromkeys(MODELS)
+        self._next_id = dict.fromkeys(MODELS, 0)
+        self._versions = dict.fromkeys(MODELS, 0)
+        # Reentrant so listeners may read the store while being notified
+        self._lock = threading.RLock()
+
+    def _bump(self, section):
+        # Called with the lock held
+        self._versions[section] += 1
+        self._snapshots[section] = None
+        return self._versions[section]
+
+    def _snapshot(self, section):
+        snapshot = self._snapshots[section]
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshots[section]
+                if snapshot is None:
+                    snapshot = self._build_snapshot(section)
+                    self._snapshots[section] = snapshot
+        return snapshot
+
+    def _build_snapshot(self, section):
+        # Called with the lock held
+        records = self._records[section]
+        return _Snapshot(tuple(records), tuple(item for item, _ in records.values()))
+
+    def all(self, section):
+        return list(self._snapshot(section).items)
+
+    def page(self, section, after=None, limit=None):
+        records = self._records[section]
+        order = self._order[section]
+        start = 0 if after is None else bisect_right(order, after)
+        result = []
+        for position in range(start, len(order)):
+            if limit is not None and len(result) >= limit:
+                break
+            item_id = order[position]
+            entry = records.get(item_id)
+            if entry is not None:
+                result.append((item_id, entry[0]))
+        return result
+
+    def snapshot(self, section):
+        snapshot = self._snapshot(section)
+        return zip(snapshot.ids, snapshot.items)
+
+    def get(self, section, item_id):
+        entry = self._records[section].get(item_id)
+        return None if entry is None else entry[0]
+
+    def add(self, section, item):
+        with self._lock:
+            item_id = self._next_id[section]
+            self._next_id[section] = item_id + 1
+            self._records[section][item_id] = (item, self._bump(section))
+            self._order[section].append(item_id)
+            self._notify(section, item_id, item)
+        return item_id
+
+    def update(self, section, item_id, item):
+        with self._lock:
+            records = self._records[section]
+            if item_id not in records:
+                return False
+            records[item_id] = (item, self._bump(section))
+            self._notify(section, item_id, item)
+        return True
+
+    def delete(self, section, item_id):
+        with self._lock:
+            if self._records[section].pop(item_id, None) is None:
+                return False
+            self._bump(section)
+            self._compact_order(section)
+            self._notify(section, item_id, None)
+        return True
+
+    def _compact_order(self, section):
+        # Called with the lock held. The list is replaced, not changed in
+        # place, so readers bisecting the old one are not disturbed.
+        records = self._records[section]
+        order = self._order[section]
+        if len(order) > 2 * len(records):
+            self._order[section] = [item_id for item_id in order if item_id in records]
+
+    def count(self, section):
+        return len(self._records[section])
+
+    def version(self, section, item_id=None):
+        if item_id is None:
+            return self._versions[section]
+        entry = self._records[section].get(item_id)
+        return None if entry is None else entry[1]
+
+
+class DurableMemoryStorage(MemoryStorage):
+    """
+    ``MemoryStorage`` that survives restarts through a write-ahead log.
+
+    Every add, update and delete is appended to a ``WriteAheadLog`` in
+    ``directory`` before it is applied in memory, and returns once the log
+    entry is as durable as the ``fsync`` policy asks for. Reads are exactly
+    as fast as with ``MemoryStorage``.
+
+    ``checkpoint`` writes a compact snapshot of the state and drops the log
+    it replaces. It runs on a daemon thread every ``checkpoint_interval``
+    seconds if anything was written, and sooner once ``checkpoint_after``
+    entries have been logged, so startup, which loads the newest snapshot
+    and replays the log after it, stays bounded however long the store has
+    been in use. Only the copy of the section dicts happens under the write
+    lock; the snapshot file is written outside it.
+
+    Parameters
+    ----------
+    directory : str
+        Where the log and snapshots are kept.
+    fsync : str
+        ``'always'``, ``'interval'`` or ``'never'`` (see ``WriteAheadLog``).
+    fsync_interval : float
+        Seconds between fsyncs in ``'interval'`` mode.
+    checkpoint_interval : float
+        Seconds between checkpoints; 0 disables the checkpoint thread.
+    checkpoint_after : int
+        Number of logged entries that triggers an early checkpoint.
+    """
+
+    def __init__(
+        self,
+        directory,
+        fsync="always",
+        fsync_interval=0.05,
+        checkpoint_interval=60,
+        checkpoint_after=10_000,
+    ):
+        super().__init__()
+        self.checkpoint_after = checkpoint_after
+        self._logged = 0
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_due = threading.Event()
+        self._stop = threading.Event()
+        self._wal = WriteAheadLog(directory, fsync, fsync_interval)
+        snapshot, entries = self._wal.recover()
+        if snapshot is not None:
+            self._restore(snapshot)
+        for entry in entries:
+            self._replay(entry)
+        self._wal.open()
+        if snapshot is None:
+            # Persist the epoch, so ETags stay valid across restarts
+            self.checkpoint()
+        if checkpoint_interval:
+            threading.Thread(
+                target=self._run_checkpoints,
+                args=(checkpoint_interval,),
+                name="wal-checkpoint",
+                daemon=True,
+            ).start()
+
+    def _restore(self, snapshot):
+        header, *records = snapshot
+        self.epoch = header["epoch"]
+        self._next_id.update(header["next_id"])
+        self._versions.update(header["versions"])
+        for section, item_id, version, values in records:
+            self._records[section][item_id] = (MODELS[section](*values), version)
+            self._order[section].append(item_id)
+
+    def _replay(self, entry):
+        operation, section, item_id, values = entry
+        if operation == "add":
+            self._next_id[section] = item_id
+            MemoryStorage.add(self, section, MODELS[section](*values))
+        elif operation == "update":
+            MemoryStorage.update(self, section, item_id, MODELS[section](*values))
+        else:
+            MemoryStorage.delete(self, section, item_id)
+
+    def _log(self, entries):
+        # Called with the lock held
+        position = self._wal.append(entries)
+        self._logged += len(entries)
+        if self._logged >= self.checkpoint_after:
+            self._checkpoint_due.set()
+        return position
+
+    def add(self, section, item):
+        with self._lock:
+            item_id = self._next_id[section]
+            position = self._log([("add", section, item_id, astuple(item))])
+            super().add(section, item)
+        self._wal.sync(position)
+        return item_id
+
+    def add_many(self, section, items):
+        items = list(items)
+        with self._lock:
+            first = self._next_id[section]
+            position = self._log([
+                ("add", section, item_id, astuple(item))
+                for item_id, item in enumerate(items, start=first)
+            ])
+            item_ids = [MemoryStorage.add(self, section, item) for item in items]
+        self._wal.sync(position)
+        return item_ids
+
+    def update(self, section, item_id, item):
+        with self._lock:
+            if item_id not in self._records[section]:
+                return False
+            position = self._log([("update", section, item_id, astuple(item))])
+            super().update(section, item_id, item)
+        self._wal.sync(position)
+        return True
+
+    def delete(self, section, item_id):
+        with self._lock:
+            if item_id not in self._records[section]:
+                return False
+            position = self._log([("delete", section, item_id, None)])
+            super().delete(section, item_id)
+        self._wal.sync(position)
+        return True
+
+    def checkpoint(self):
+        """
+        Writes a snapshot of the current state and deletes the log entries
+        and older snapshots it makes redundant.
+        """
+        with self._checkpoint_lock:
+            with self._lock:
+                number = self._wal.rotate()
+                self._logged = 0
+                self._checkpoint_due.clear()
+                header = {
+                    "epoch": self.epoch,
+                    "next_id": dict(self._next_id),
+                    "versions": dict(self._versions),
+                }
+                sections = {
+                    section: list(records.items())
+                    for section, records in self._records.items()
+                }
+
+            def entries():
+                yield header
+                for section, records in sections.items():
+                    for item_id, (item, version) in records:
+                        yield section, item_id, version, astuple(item)
+
+            self._wal.write_snapshot(number, entries())
+
+    def _run_checkpoints(self, interval):
+        while not self._stop.is_set():
+            self._checkpoint_due.wait(interval)
+            if self._logged and not self._stop.is_set():
+                self.checkpoint()
+
+    def close(self):
+        """
+        Stops the background threads and closes the log.
+        """
+        self._stop.set()
+        self._checkpoint_due.set()
+        with self._checkpoint_lock:
+            self._wal.close()
+
+
+class _Columns:
+    """
+    Column-oriented table of one section.
+
+    Row ``n`` of the table is ``ids[n]``, ``versions[n]`` and ``values[f][n]``
+    for every field ``f``. IDs and versions are packed into machine-integer
+    arrays rather than int objects. Rows are appended in ID order, so a
+    record is found by binary search on ``ids``; a version of 0 marks a
+    deleted row.
+    """
+
+    __slots__ = ("ids", "versions", "values", "live")
+
+    def __init__(self, width):
+        self.ids = array("q")
+        self.versions = array("q")
+        self.values = [[] for _ in range(width)]
+        self.live = 0
+
+    def find(self, item_id):
+        """
+        Returns the row of ``item_id``, or None if there is none.
+        """
+        row = bisect_left(self.ids, item_id)
+        if row < len(self.ids) and self.ids[row] == item_id and self.versions[row]:
+            return row
+        return None
+
+    def append(self, item_id, version, row_values):
+        """
+        Appends a row. ``item_id`` must be greater than every ID so far.
+        """
+        for column, value in zip(self.values, row_values):
+            column.append(value)
+        self.ids.append(item_id)
+        self.versions.append(version)
+        self.live += 1
+
+
+class ColumnarMemoryStorage(MemoryStorage):
+    """
+    In-memory storage that keeps each section as columns instead of objects.
+
+    Records are stored as one list per field rather than one model instance
+    each, with IDs and versions in packed arrays and no per-record dict
+    entry. With interned field values a record costs little more than its
+    unique strings. Model instances are only built when a record is read,
+    so this suits very large collections that are mostly written in bulk
+    and read in pages.
+
+    Lookups are O(log n) binary searches, and so is finding the start of a
+    page, which then builds model instances for its own rows only. Updates
+    overwrite a row in place, so unlike ``MemoryStorage`` single-record
+    reads and pages take the lock to never see a half-written row. Deletes
+    clear a row, and the table is rebuilt once more than half of its rows
+    are cleared.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tables = {}
+        self._getters = {}
+        for section, model in MODELS.items():
+            names = [f.name for f in fields(model)]
+            self._tables[section] = _Columns(len(names))
+            self._getters[section] = attrgetter(*names)
+
+    def _build_snapshot(self, section):
+        # Called with the lock held
+        table = self._tables[section]
+        model = MODELS[section]
+        rows = [row for row, version in enumerate(table.versions) if version]
+        return _Snapshot(
+            tuple(table.ids[row] for row in rows),
+            tuple(model(*(column[row] for column in table.values)) for row in rows),
+        )
+
+    def _compact(self, section):
+        # Called with the lock held
+        table = self._tables[section]
+        if len(table.ids) <= 2 * table.live:
+            return
+        compacted = _Columns(len(table.values))
+        for row, version in enumerate(table.versions):
+            if version:
+                compacted.append(
+                    table.ids[row], version, [column[row] for column in table.values]
+                )
+        self._tables[section] = compacted
+
+    def page(self, section, after=None, limit=None):
+        model = MODELS[section]
+        result = []
+        with self._lock:
+            table = self._tables[section]
+            row = 0 if after is None else bisect_right(table.ids, after)
+            while row < len(table.ids) and (limit is None or len(result) < limit):
+                if table.versions[row]:
+                    item = model(*(column[row] for column in table.values))
+                    result.append((table.ids[row], item))
+                row += 1
+        return result
+
+    def get(self, section, item_id):
+        with self._lock:
+            table = self._tables[section]
+            row = table.find(item_id)
+            if row is None:
+                return None
+            return MODELS[section](*(column[row] for column in table.values))
+
+    def add(self, section, item):
+        with self._lock:
+            item_id = self._next_id[section]
+            self._next_id[section] = item_id + 1
+            self._tables[section].append(
+                item_id, self._bump(section), self._getters[section](item)
+            )
+            self._notify(section, item_id, item)
+        return item_id
+
+    def update(self, section, item_id, item):
+        with self._lock:
+            table = self._tables[section]
+            row = table.find(item_id)
+            if row is None:
+                return False
+            for column, value in zip(table.values, self._getters[section](item)):
+                column[row] = value
+            table.versions[row] = self._bump(section)
+            self._notify(section, item_id, item)
+        return True
+
+    def delete(self, section, item_id):
+        with self._lock:
+            table = self._tables[section]
+            row = table.find(item_id)
+            if row is None:
+                return False
+            for column in table.values:
+                column[row] = None
+            table.versions[row] = 0
+            table.live -= 1
+            self._bump(section)
+            self._compact(section)
+            self._notify(section, item_id, None)
+        return True
+
+    def count(self, section):
+        return self._tables[section].live
+
+    def version(self, section, item_id=None):
+        if item_id is None:
+            return self._versions[section]
+        with self._lock:
+            table = self._tables[section]
+            row = table.find(item_id)
+            return None if row is None else table.versions[row]
+
+
+class SQLiteStorage(Storage):
+    """
+    Keeps records in an SQLite database using write-ahead logging, so
+    readers never block each other or the writer.
+
+    IDs are SQLite row IDs; ``AUTOINCREMENT`` guarantees they are never
+    reused after a delete. Version counters live in the database too, so
+    every worker process sharing the file sees the same ETags. Every thread
+    gets its own connection. The SQL for each section is built once, and
+    SQLite's per-connection statement cache keeps it prepared.
+
+    Listeners only hear of writes made through this object, not of those
+    made by other processes sharing the file; ``ReplicatedStorage`` reports
+    both.
+    """
+
+    notifies_all_writes = False
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        # SQLite serializes the writes themselves; this lock also keeps the
+        # listener notifications of this process in commit order.
+        self._write_lock = threading.RLock()
+        self._sql = {}
+        for section, model in MODELS.items():
+            names = [f.name for f in fields(model)]
+            columns = ", ".join(names)
+            self._sql[section] = {
+                "create": (
+                    f"CREATE TABLE IF NOT EXISTS {section} ("
+                    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    + ", ".join(f"{name} TEXT NOT NULL" for name in names)
+                    + ", version INTEGER NOT NULL DEFAULT 0)"
+                ),
+                "all": f"SELECT {columns} FROM {section} ORDER BY id",
+                "page": (
+                    f"SELECT id, {columns} FROM {section} "
+                    "WHERE id > ? ORDER BY id LIMIT ?"
+                ),
+                "get": f"SELECT {columns} FROM {section} WHERE id = ?",
+                "add": (
+                    f"INSERT INTO {section} ({columns}, version) "
+                    f"VALUES ({', '.join('?' * (len(names) + 1))})"
+                ),
+                "update": (
+                    f"UPDATE {section} SET "
+                    + ", ".join(f"{name} = ?" for name in names)
+                    + ", version = ? WHERE id = ?"
+                ),
+                "delete": f"DELETE FROM {section} WHERE id = ?",
+                "count": f"SELECT COUNT(*) FROM {section}",
+                "version": f"SELECT version FROM {section} WHERE id = ?",
+            }
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('epoch', ?)", (uuid.uuid4().hex,)
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions "
+                "(section TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            for section, statements in self._sql.items():
+                conn.execute(statements["create"])
+                info = conn.execute(f"PRAGMA table_info({section})").fetchall()
+                if "version" not in [row[1] for row in info]:
+                    # Databases created before version counters existed
+                    conn.execute(
+                        f"ALTER TABLE {section} "
+                        "ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+                    )
+                conn.execute(
+                    "INSERT OR IGNORE INTO versions VALUES (?, 0)", (section,)
+                )
+        self.epoch = conn.execute(
+            "SELECT value FROM meta WHERE key = 'epoch'"
+        ).fetchone()[0]
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _bump(conn, section):
+        return conn.execute(
+            "UPDATE versions SET version = version + 1 WHERE section = ? "
+            "RETURNING version",
+            (section,),
+        ).fetchone()[0]
+
+    def all(self, section):
+        model = MODELS[section]
+        rows = self._connection().execute(self._sql[section]["all"])
+        return [model(*row) for row in rows]
+
+    def page(self, section, after=None, limit=None):
+        model = MODELS[section]
+        rows = self._connection().execute(
+            self._sql[section]["page"],
+            (-1 if after is None else after, -1 if limit is None else limit),
+        )
+        return [(row[0], model(*row[1:])) for row in rows]
+
+    def snapshot(self, section):
+        model = MODELS[section]
+        # A separate connection holding one read transaction sees a fixed
+        # snapshot of the database under WAL, however long the caller takes.
+        # The first step of the SELECT pins that snapshot, so it is taken now
+        # rather than when iteration starts.
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("BEGIN")
+        cursor = conn.execute(self._sql[section]["page"], (-1, -1))
+
+        def records():
+            try:
+                while rows := cursor.fetchmany(500):
+                    for row in rows:
+                        yield row[0], model(*row[1:])
+            finally:
+                conn.close()
+
+        return records()
+
+    def get(self, section, item_id):
+        row = (
+            self._connection()
+            .execute(self._sql[section]["get"], (item_id,))
+            .fetchone()
+        )
+        return MODELS[section](*row) if row else None
+
+    def add(self, section, item):
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                version = self._bump(conn, section)
+                item_id = conn.execute(
+                    self._sql[section]["add"], (*astuple(item), version)
+                ).lastrowid
+            self._notify(section, item_id, item)
+            return item_id
+
+    def add_many(self, section, items):
+        items = list(items)
+        with self._write_lock:
+            conn = self._connection()
+            sql = self._sql[section]["add"]
+            with conn:
+                # One transaction and one version bump for the whole batch
+                version = self._bump(conn, section)
+                item_ids = [
+                    conn.execute(sql, (*astuple(item), version)).lastrowid
+                    for item in items
+                ]
+            for item_id, item in zip(item_ids, items):
+                self._notify(section, item_id, item)
+            return item_ids
+
+    def update(self, section, item_id, item):
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                version = self._bump(conn, section)
+                cursor = conn.execute(
+                    self._sql[section]["update"],
+                    (*astuple(item), version, item_id),
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return False
+            self._notify(section, item_id, item)
+            return True
+
+    def delete(self, section, item_id):
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(self._sql[section]["delete"], (item_id,))
+                if cursor.rowcount == 0:
+                    return False
+                self._bump(conn, section)
+            self._notify(section, item_id, None)
+            return True
+
+    def count(self, section):
+        return self._connection().execute(self._sql[section]["count"]).fetchone()[0]
+
+    def version(self, section, item_id=None):
+        conn = self._connection()
+        if item_id is None:
+            return conn.execute(
+                "SELECT version FROM versions WHERE section = ?", (section,)
+            ).fetchone()[0]
+        row = conn.execute(self._sql[section]["version"], (item_id,)).fetchone()
+        return row[0] if row else None
+
+    def seed(self, defaults):
+        conn = self._connection()
+        with conn:
+            # Take the write lock up front so two workers starting at the same
+            # time cannot both see an empty database and seed it twice.
+            conn.execute("BEGIN IMMEDIATE")
+            if any(
+                conn.execute(self._sql[section]["count"]).fetchone()[0]
+                for section in MODELS
+            ):
+                return
+            for section, items in defaults.items():
+                for item in items:
+                    version = self._bump(conn, section)
+                    conn.execute(self._sql[section]["add"], (*astuple(item), version))
+
+
+class ReplicatedStorage(MemoryStorage):
+    """
+    Per-process in-memory replica of a shared SQLite database, for running
+    several worker processes.
+
+    The database is the single authoritative store: writes go through a
+    ``SQLiteStorage``, and triggers record every change made by any process
+    in a ``changes`` table. Each process keeps a ``MemoryStorage`` copy of
+    the records and serves every read from it at in-memory speed. It
+    catches up by reading the change log after each of its own writes and
+    every ``poll_interval`` seconds on a daemon thread, re-fetching only
+    the records that changed. Listeners are notified of every change made
+    by any process, in the order of the log, so response caches and search
+    indexes stay in step in every worker.
+
+    A worker sees its own writes at once and those of other workers within
+    ``poll_interval``. With ``poll_interval=0`` there is no thread and every
+    read checks the log first (one indexed query), so reads are never stale.
+    Log entries are kept for ``retain`` seconds; a process that falls
+    further behind reloads everything.
+
+    Parameters
+    ----------
+    path : str
+        The SQLite database file.
+    poll_interval : float
+        Seconds between checks for changes made by other processes.
+    retain : float
+        Seconds for which change log entries are kept.
+    """
+
+    def __init__(self, path, poll_interval=0.05, retain=600):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.retain = retain
+        self._db = SQLiteStorage(path)
+        self.epoch = self._db.epoch
+        self._seq = 0
+        self._trimmed = 0
+        self._catching_up = False
+        self._sql = {}
+        for section, model in MODELS.items():
+            columns = ", ".join(f.name for f in fields(model))
+            self._sql[section] = {
+                "all": f"SELECT id, {columns}, version FROM {section} ORDER BY id",
+                "get": f"SELECT {columns}, version FROM {section} WHERE id = ?",
+            }
+        conn = self._db._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "section TEXT NOT NULL, item_id INTEGER NOT NULL, at INTEGER NOT NULL)"
+            )
+            events = (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD"))
+            for section in MODELS:
+                for event, row in events:
+                    conn.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {section}_{event.lower()} "
+                        f"AFTER {event} ON {section} BEGIN "
+                        "INSERT INTO changes (section, item_id, at) VALUES "
+                        f"('{section}', {row}.id, "
+                        "CAST(strftime('%s', 'now') AS INTEGER)); "
+                        "END"
+                    )
+        with self._lock:
+            self._reload()
+        if poll_interval:
+            threading.Thread(
+                target=self._poll, name="replica-poll", daemon=True
+            ).start()
+
+    def _reload(self):
+        # Called with the lock held. Copies the whole database, and tells
+        # listeners about every record that differs from the old copy.
+        conn = self._db._connection()
+        conn.execute("BEGIN")
+        try:
+            # The last sequence number handed out, even if trimmed since
+            self._seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence "
+                "WHERE name = 'changes'"
+            ).fetchone()[0]
+            versions = dict(conn.execute("SELECT section, version FROM versions"))
+            tables = {
+                section: {
+                    row[0]: (MODELS[section](*row[1:-1]), row[-1])
+                    for row in conn.execute(self._sql[section]["all"])
+                }
+                for section in MODELS
+            }
+        finally:
+            conn.rollback()
+        for section, records in tables.items():
+            old = self._records[section]
+            self._records[section] = records
+            self._order[section] = list(records)
+            self._versions[section] = versions[section]
+            self._snapshots[section] = None
+            for item_id, entry in records.items():
+                if old.get(item_id) != entry:
+                    self._notify(section, item_id, entry[0])
+            for item_id in old.keys() - records.keys():
+                self._notify(section, item_id, None)
+
+    def _catch_up(self):
+        """
+        Applies the changes logged since the last catch-up.
+        """
+        with self._lock:
+            if self._catching_up:
+                # A listener reading the store while being notified
+                return
+            self._catching_up = True
+            try:
+                self._apply_changes()
+            finally:
+                self._catching_up = False
+
+    def _apply_changes(self):
+        # Called with the lock held
+        conn = self._db._connection()
+        last = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+        ).fetchone()
+        if last is None or last[0] <= self._seq:
+            return
+        changes = conn.execute(
+            "SELECT seq, section, item_id FROM changes WHERE seq > ? ORDER BY seq",
+            (self._seq,),
+        ).fetchall()
+        if not changes or changes[0][0] != self._seq + 1:
+            # Entries this process never saw were already trimmed
+            self._reload()
+            return
+        for seq, section, item_id in changes:
+            row = conn.execute(self._sql[section]["get"], (item_id,)).fetchone()
+            entry = None if row is None else (MODELS[section](*row[:-1]), row[-1])
+            records = self._records[section]
+            if records.get(item_id) != entry:
+                if entry is None:
+                    records.pop(item_id, None)
+                    self._compact_order(section)
+                else:
+                    if item_id not in records:
+                        # Changes come in commit order, so a new ID is the
+                        # highest so far
+                        self._order[section].append(item_id)
+                    records[item_id] = entry
+                self._snapshots[section] = None
+                self._notify(section, item_id, None if entry is None else entry[0])
+            self._seq = seq
+        for section, version in conn.execute("SELECT section, version FROM versions"):
+            if self._versions[section] != version:
+                self._versions[section] = version
+                self._snapshots[section] = None
+        now = time.time()
+        if now - self._trimmed > self.retain / 2:
+            self._trimmed = now
+            with conn:
+                conn.execute("DELETE FROM changes WHERE at < ?", (now - self.retain,))
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self._catch_up()
+
+    def _read(self):
+        if not self.poll_interval:
+            self._catch_up()
+
+    def all(self, section):
+        self._read()
+        return super().all(section)
+
+    def page(self, section, after=None, limit=None):
+        self._read()
+        return super().page(section, after, limit)
+
+    def snapshot(self, section):
+        self._read()
+        return super().snapshot(section)
+
+    def get(self, section, item_id):
+        self._read()
+        return super().get(section, item_id)
+
+    def count(self, section):
+        self._read()
+        return super().count(section)
+
+    def version(self, section, item_id=None):
+        self._read()
+        return super().version(section, item_id)
+
+    def add(self, section, item):
+        item_id = self._db.add(section, item)
+        self._catch_up()
+        return item_id
+
+    def add_many(self, section, items):
+        item_ids = self._db.add_many(section, items)
+        self._catch_up()
+        return item_ids
+
+    def update(self, section, item_id, item):
+        updated = self._db.update(section, item_id, item)
+        self._catch_up()
+        return updated
+
+    def delete(self, section, item_id):
+        deleted = self._db.delete(section, item_id)
+        self._catch_up()
+        return deleted
+
+    def seed(self, defaults):
+        self._db.seed(defaults)
+        self._catch_up()
+
+
+def create_storage(url=None):
+    """
+    Builds a storage backend from a URL.
+
+    Parameters
+    ----------
+    url : str, optional
+        ``None`` or ``'memory'`` for in-process storage, ``'columnar'`` for
+        column-oriented in-process storage,
+        ``'wal:///path/to/directory'`` for in-process storage with a
+        write-ahead log, ``'sqlite:///path/to/file.db'`` for SQLite, or
+        ``'shared:///path/to/file.db'`` for SQLite with an in-process
+        replica (``?poll_interval=`` sets how often it catches up). WAL
+        options go in the query string, as in
+        ``'wal:///data/resume?fsync=interval&fsync_interval=0.1'``. As in
+        ``file:`` URLs, the path starts at the third slash, so it is
+        absolute: ``'sqlite:///tmp/resume.db'`` opens ``/tmp/resume.db``.
+
+    Returns
+    -------
+    Storage
+        The storage backend.
+    """
+    if not url or url == "memory":
+        return MemoryStorage()
+    if url == "columnar":
+        return ColumnarMemoryStorage()
+    if url.startswith("wal:///"):
+        path, _, query = url[len("wal://"):].partition("?")
+        options = dict(parse_qsl(query))
+        return DurableMemoryStorage(
+            path,
+            fsync=options.get("fsync", "always"),
+            fsync_interval=float(options.get("fsync_interval", 0.05)),
+            checkpoint_interval=float(options.get("checkpoint_interval", 60)),
+            checkpoint_after=int(options.get("checkpoint_after", 10_000)),
+        )
+    if url.startswith("shared:///"):
+        path, _, query = url[len("shared://"):].partition("?")
+        options = dict(parse_qsl(query))
+        return ReplicatedStorage(
+            path,
+            poll_interval=float(options.get("poll_interval", 0.05)),
+            retain=float(options.get("retain", 600)),
+        )
+    if url.startswith("sqlite:///"):
+        return SQLiteStorage(url[len("sqlite://"):])
+    raise ValueError(f"Unsupported storage URL: {url}")
@@ -2,7 +2,42 @@
 Tests in Pytest
 """
 
-from app import app
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+from dataclasses import asdict
+
+import pytest
+
+from app import (
+    app,
+    logo_store,
+    metrics,
+    profiler,
+    referenced_logos,
+    renderer,
+    response_cache,
+    store,
+)
+from asgi import application
+from cache import ResponseCache
+from dates import DateIndex
+from json_provider import make_encoder
+from metrics import Metrics
+from profiling import StackSampler
+from render import DocumentRenderer
+from search import SearchIndex
+from models import Experience, Skill
+from storage import (
+    ColumnarMemoryStorage,
+    DurableMemoryStorage,
+    MemoryStorage,
+    ReplicatedStorage,
+    SQLiteStorage,
+    create_storage,
+)
 
 
 def test_client():
@@ -48,17 +83,17 @@ def test_experience():
 
     # Convert response data to dict for comparison
     experience_dict = {
-        "title": response.json[item_id].get("title"),
-        "company": response.json[item_id].get("company"),
-        "start_date": response.json[item_id].get("start_date"),
-        "end_date": response.json[item_id].get("end_date"),
-        "description": response.json[item_id].get("description"),
-        "logo": response.json[item_id].get("logo"),
+        "title": response.json[-1].get("title"),
+        "company": response.json[-1].get("company"),
+        "start_date": response.json[-1].get("start_date"),
+        "end_date": response.json[-1].get("end_date"),
+        "description": response.json[-1].get("description"),
+        "logo": response.json[-1].get("logo"),
     }
     assert experience_dict == example_experience
 
-    # Test that index matches position in list
-    assert item_id == len(response.json) - 1
+    # Test that the new entry can be fetched by its id
+    assert app.test_client().get(f"/resume/experience/{item_id}").json == example_experience
 
 
 def test_get_experience_by_id():
@@ -124,8 +159,8 @@ def test_update_experience():
     assert response.status_code == 200
     response_data = response.json
     assert response_data["message"] == "Experience updated successfully"
-    get_response = app.test_client().get("/resume/experience")
-    updated_experience = get_response.json[item_id]
+    get_response = app.test_client().get(f"/resume/experience/{item_id}")
+    updated_experience = get_response.json
 
     assert updated_experience["title"] == updated_data["title"]
     assert updated_experience["company"] == updated_data["company"]
@@ -162,8 +197,8 @@ def test_update_experience_with_unknown_field():
         f"/resume/experience/{item_id}", json=updated_experience
     )
     assert response.status_code == 200
-    get_response = app.test_client().get("/resume/experience")
-    saved_data = get_response.json[item_id]
+    get_response = app.test_client().get(f"/resume/experience/{item_id}")
+    saved_data = get_response.json
     assert "new_field" not in saved_data
     assert saved_data["title"] == "Updated Title"
 
@@ -224,32 +259,6 @@ def test_update_experience_with_missing_fields():
     assert response.status_code == 400
     assert "error" in response.json
 
-def test_delete_experience():
-    """
-    add an experience entry
-    delete that experience entry by index.
-    Check that it is deleted successfully with correct response.
-    """
-    example_experience = {
-        "title": "Backend Engineer",
-        "company": "Google",
-        "start_date": "March 2023",
-        "end_date": "Present",
-        "description": "Working on scalable systems",
-        "logo": "example-logo.png",
-    }
-
-    post_response = app.test_client().post("/resume/experience", json=example_experience)
-    assert post_response.status_code == 201
-    item_id = post_response.json["id"]
-    delete_response = app.test_client().delete(f"/resume/experience/{item_id}")
-    assert delete_response.status_code == 200
-    assert delete_response.json["message"] == "Experience has been deleted"
-    delete_response = app.test_client().delete(f"/resume/experience/{item_id}")
-    assert delete_response.status_code == 400
-    assert delete_response.json["error"] == "Invalid request"
-
-
 def test_delete_experience():
     """
     add an experience entry
@@ -305,16 +314,16 @@ def test_education():
     assert len(response.json) == initial_length + 1
 
     education_dict = {
-        "course": response.json[item_id].get("course"),
-        "school": response.json[item_id].get("school"),
-        "start_date": response.json[item_id].get("start_date"),
-        "end_date": response.json[item_id].get("end_date"),
-        "grade": response.json[item_id].get("grade"),
-        "logo": response.json[item_id].get("logo"),
+        "course": response.json[-1].get("course"),
+        "school": response.json[-1].get("school"),
+        "start_date": response.json[-1].get("start_date"),
+        "end_date": response.json[-1].get("end_date"),
+        "grade": response.json[-1].get("grade"),
+        "logo": response.json[-1].get("logo"),
     }
     assert education_dict == example_education
 
-    assert item_id == len(response.json) - 1
+    assert app.test_client().get(f"/resume/education/{item_id}").json == example_education
 
 
 def test_get_education_by_id():
@@ -375,8 +384,8 @@ def test_update_education():
     response_data = response.json
     assert response_data["message"] == "Education updated successfully"
 
-    get_response = app.test_client().get("/resume/education")
-    updated_education = get_response.json[item_id]
+    get_response = app.test_client().get(f"/resume/education/{item_id}")
+    updated_education = get_response.json
 
     assert updated_education["course"] == updated_data["course"]
     assert updated_education["school"] == updated_data["school"]
@@ -414,8 +423,8 @@ def test_update_education_with_unknown_field():
     )
 
     assert response.status_code == 200
-    get_response = app.test_client().get("/resume/education")
-    saved_data = get_response.json[item_id]
+    get_response = app.test_client().get(f"/resume/education/{item_id}")
+    saved_data = get_response.json
     assert "new_field" not in saved_data
     assert saved_data["course"] == "Health Sciences"
 
@@ -477,28 +486,6 @@ def test_update_education_with_missing_fields():
     assert response.status_code == 400
     assert "error" in response.json
 
-    # Test empty payload:
-    response = client.post('/resume/education', json=empty_education)
-    assert response.status_code == 400
-    assert response.json['error'] == "No data provided"
-
-    # Test missing field:
-    response = client.post('/resume/education', json=missing_education)
-    assert response.status_code == 400
-    assert response.json['error'] == "Missing required fields"
-
-    # Test valid education:
-    response = client.post('/resume/education', json=example_education)
-    assert response.status_code == 201
-    item_id = response.json['id']
-    assert isinstance(item_id, int)
-    assert item_id == 1
-
-    # Test retrieval:
-    # TODO: The GET endpoint needs to be implemented in `app.py` for this to pass. # pylint: disable=fixme
-    response = client.get('/resume/education')
-    assert response.status_code == 200
-    assert response.json[item_id] == example_education
 
 def test_delete_education():
     """
@@ -518,9 +505,8 @@ def test_delete_education():
     client = app.test_client()
 
     # Add new education:
-    # TODO: Implement the '/resume/education' POST route in `app.py` before running this test. # pylint: disable=fixme
     post_resp = client.post("/resume/education", json=example_education)
-    assert post_resp.status_code == 200
+    assert post_resp.status_code == 201
     item_id = post_resp.json["id"]
 
     # Delete the education using the ID:
@@ -549,7 +535,8 @@ def test_skill():
     item_id = app.test_client().post("/resume/skill", json=example_skill).json["id"]
 
     response = app.test_client().get("/resume/skill")
-    assert response.json[item_id] == example_skill
+    assert response.json[-1] == example_skill
+    assert app.test_client().get(f"/resume/skill/{item_id}").json == example_skill
 
 
 def test_skill_missing_fields():
@@ -560,7 +547,7 @@ def test_skill_missing_fields():
     response = app.test_client().post("/resume/skill", json=example_skill)
 
     assert response.status_code == 400
-    assert response.json["error"] == "Missing required fields"
+    assert response.json["error"] == "Missing required fields: proficiency"
 
 
 def test_skill_id_return():
@@ -643,13 +630,17 @@ def test_delete_skill():
 
     # Add new skill
     post_response = client.post("/resume/skill", json=example_skill)
-    assert post_response.status_code == 200
-    item_id = post_response.json["index"]
+    assert post_response.status_code == 201
+    item_id = post_response.json["id"]
 
     # Delete skill
     delete_response = client.delete(f"/resume/skill/{item_id}")
     assert delete_response.status_code == 200
-    assert delete_response.json["deleted"] is True
+    assert delete_response.json["message"] == "Successfully deleted skill"
+
+    # Delete again to check if it fails
+    delete_response = client.delete(f"/resume/skill/{item_id}")
+    assert delete_response.status_code == 404
 
 
 def test_get_skill_by_index():
@@ -666,12 +657,1003 @@ def test_get_skill_by_index():
 
     # Add skill
     post_response = client.post("resume/skill", json=example_skill)
-    assert post_response.status_code == 200
-    item_id = post_response.json["index"]
+    assert post_response.status_code == 201
+    item_id = post_response.json["id"]
 
     # Retrieve skill by index
-    response = client.post(f'/resume/skill/{item_id}')
+    response = client.get(f"/resume/skill/{item_id}")
+    assert response.status_code == 200
+    assert response.json == example_skill
+
+
+# Storage backends under test, built in a temporary directory
+BACKENDS = {
+    "memory": lambda directory: MemoryStorage(),
+    "columnar": lambda directory: ColumnarMemoryStorage(),
+    "wal": lambda directory: DurableMemoryStorage(
+        str(directory / "wal"), fsync="never", checkpoint_interval=0
+    ),
+    "sqlite": lambda directory: SQLiteStorage(str(directory / "resume.db")),
+    "shared": lambda directory: ReplicatedStorage(
+        str(directory / "shared.db"), poll_interval=0
+    ),
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request, tmp_path):
+    """
+    Each storage backend in turn, empty.
+    """
+    storage = BACKENDS[request.param](tmp_path)
+    yield storage
+    if hasattr(storage, "close"):
+        storage.close()
+
+
+def test_storage_backends(backend):
+    """
+    Every storage backend stores, updates and deletes records the same way.
+    """
+    first = backend.add("skill", Skill("Python", "1-2 Years", "example-logo.png"))
+    second = backend.add("skill", Skill("Go", "1 Year", "example-logo.png"))
+    assert backend.count("skill") == 2
+    assert backend.get("skill", second) == Skill("Go", "1 Year", "example-logo.png")
+
+    assert backend.update("skill", first, Skill("Rust", "2 Years", "logo.png"))
+    assert backend.all("skill")[0].name == "Rust"
+
+    assert backend.delete("skill", first)
+    assert backend.count("skill") == 1
+    assert backend.get("skill", 999) is None
+    assert not backend.delete("skill", 999)
+
+    # IDs survive deletes of earlier records and are never reused
+    assert backend.get("skill", second).name == "Go"
+    third = backend.add("skill", Skill("C", "5 Years", "example-logo.png"))
+    assert third > second
+    assert not backend.delete("skill", first)
+
+    # Pages skip deleted records and start after the cursor
+    assert [item_id for item_id, _ in backend.page("skill", limit=1)] == [second]
+    assert backend.page("skill", after=second, limit=5) == [
+        (third, Skill("C", "5 Years", "example-logo.png"))
+    ]
+    assert backend.page("skill", after=third) == []
+    if isinstance(backend, MemoryStorage):
+        # Pages bisect the ordered IDs instead of copying the section
+        assert backend._snapshots["skill"] is None  # pylint: disable=protected-access
+
+    # Batches may come from a generator; listeners hear of every record
+    notified = []
+    backend.subscribe(lambda section, item_id, item: notified.append(item_id))
+    item_ids = backend.add_many(
+        "skill", (Skill(name, "1 Year", "a.png") for name in ("Zig", "Elm"))
+    )
+    assert notified == item_ids
+    assert [backend.get("skill", item_id).name for item_id in item_ids] == [
+        "Zig",
+        "Elm",
+    ]
+
+
+def test_create_storage(tmp_path):
+    """
+    Storage URLs keep the absolute path after the scheme.
+    """
+    path = str(tmp_path / "resume.db")
+    assert path.startswith("/")
+    backend = create_storage("sqlite://" + path)
+    assert isinstance(backend, SQLiteStorage)
+    assert backend.path == path
+    assert os.path.isfile(path)
+
+    directory = str(tmp_path / "wal")
+    backend = create_storage(f"wal://{directory}?fsync=never")
+    assert isinstance(backend, DurableMemoryStorage)
+    item_id = backend.add("skill", Skill("Python", "1-2 Years", "example-logo.png"))
+    backend.close()
+    assert os.listdir(directory)
+    backend = create_storage(f"wal://{directory}")
+    assert backend.get("skill", item_id).name == "Python"
+    backend.close()
+
+    path = str(tmp_path / "shared.db")
+    backend = create_storage(f"shared://{path}?poll_interval=0")
+    assert isinstance(backend, ReplicatedStorage)
+    assert backend.poll_interval == 0
+    assert os.path.isfile(path)
+
+
+def test_experience_pagination():
+    """
+    Walk the experience list page by page with limit and cursor.
+    """
+    client = app.test_client()
+    for number in range(5):
+        client.post(
+            "/resume/experience",
+            json={
+                "title": f"Engineer {number}",
+                "company": "Paged Company",
+                "start_date": "January 2020",
+                "end_date": "Present",
+                "description": "Writing Python Code",
+                "logo": "example-logo.png",
+            },
+        )
+    everything = client.get("/resume/experience").json
+
+    collected = []
+    url = "/resume/experience?limit=2"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json) <= 2
+        collected.extend(response.json)
+        link = response.headers.get("Link")
+        url = link[link.index("<") + 1 : link.index(">")] if link else None
+    assert collected == everything
+
+    assert client.get("/resume/experience?limit=0").status_code == 400
+    assert client.get("/resume/experience?limit=abc").status_code == 400
+    assert client.get("/resume/experience?cursor=!!").status_code == 400
+
+
+def test_conditional_get():
+    """
+    Matching If-None-Match gets a 304 until the data changes.
+    """
+    client = app.test_client()
+    example_skill = {"name": "Go", "proficiency": "1 Year", "logo": "example-logo.png"}
+    item_id = client.post("/resume/skill", json=example_skill).json["id"]
+
+    for url in ["/resume/skill", f"/resume/skill/{item_id}"]:
+        response = client.get(url)
+        etag = response.headers["ETag"]
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+        assert cached.headers["ETag"] == etag
+
+    list_etag = client.get("/resume/skill").headers["ETag"]
+    item_etag = client.get(f"/resume/skill/{item_id}").headers["ETag"]
+    assert client.get("/resume/skill?limit=1").headers["ETag"] != list_etag
+
+    client.delete(f"/resume/skill/{item_id}")
+    response = client.get("/resume/skill", headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != list_etag
+    response = client.get(f"/resume/skill/{item_id}", headers={"If-None-Match": item_etag})
+    assert response.status_code == 404
+
+
+def test_response_cache():
+    """
+    Repeated reads are served from the cache until a write invalidates them.
+    """
+    client = app.test_client()
+    client.get("/resume/education")
+    assert client.get("/resume/education").headers["X-Cache"] == "HIT"
+
+    example_education = {
+        "course": "Mathematics",
+        "school": "MIT",
+        "start_date": "September 2018",
+        "end_date": "June 2022",
+        "grade": "95%",
+        "logo": "example-logo.png",
+    }
+    client.post("/resume/education", json=example_education)
+    response = client.get("/resume/education")
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json[-1] == example_education
+
+    cache = ResponseCache(max_bytes=10)
+    cache.put(("skill", 1, b""), "a", b"12345")
+    cache.put(("skill", 2, b""), "b", b"12345")
+    assert cache.get(("skill", 1, b""), "a") == (b"12345", {})
+    cache.put(("skill", 3, b""), "c", b"12345")
+    assert cache.get(("skill", 2, b""), "b") is None
+    assert cache.get(("skill", 1, b""), "stale") is None
+    cache.invalidate("skill", 1)
+    assert cache.get(("skill", 1, b""), "a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 5
+
+
+def test_json_provider():
+    """
+    The fast encoders produce the same data as dataclasses.asdict, in field order.
+    """
+    experience = Experience(
+        "Software Developer",
+        "A Cool Company",
+        "October 2022",
+        "Present",
+        "Writing Python Code",
+        "example-logo.png",
+    )
+    encoded = make_encoder(Experience)(experience)
+    assert encoded == asdict(experience)
+    assert list(encoded) == list(asdict(experience))
+    assert make_encoder(Experience, ["company"])(experience) == {
+        "company": "A Cool Company"
+    }
+
+    with app.app_context():
+        assert app.json.loads(app.json.dumps([experience])) == [asdict(experience)]
+        assert app.json.loads(app.json.dumps({"item": experience})) == {
+            "item": asdict(experience)
+        }
+
+
+def test_bulk_import():
+    """
+    Import skills from NDJSON and check the per-line results.
+    """
+    client = app.test_client()
+    initial_length = len(client.get("/resume/skill").json)
+    lines = [
+        '{"name": "Rust", "proficiency": "1 Year", "logo": "example-logo.png"}',
+        "",
+        '{"name": "Haskell", "logo": "example-logo.png"}',
+        "not json",
+        '{"name": "Zig", "proficiency": "2 Years", "logo": "example-logo.png"}',
+    ]
+    response = client.post(
+        "/resume/skill/bulk",
+        data="\n".join(lines) + "\n",
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 200
+    results = [app.json.loads(line) for line in response.data.splitlines()]
+
+    created = {result["line"]: result["id"] for result in results if "id" in result}
+    errors = {result["line"]: result["error"] for result in results if "error" in result}
+    assert sorted(created) == [1, 5]
+    assert "proficiency" in errors[3]
+    assert errors[4] == "Invalid data format"
+    assert results[-1] == {"created": 2, "failed": 2}
+
+    assert client.get(f"/resume/skill/{created[5]}").json["name"] == "Zig"
+    assert len(client.get("/resume/skill").json) == initial_length + 2
+
+    assert client.post("/resume/unknown/bulk", data="").status_code == 404
+
+
+def test_stream_export():
+    """
+    Stream a section as NDJSON.
+    """
+    client = app.test_client()
+    expected = client.get("/resume/experience").json
+    for response in [
+        client.get("/resume/experience?stream=1"),
+        client.get("/resume/experience", headers={"Accept": "application/x-ndjson"}),
+    ]:
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        assert [app.json.loads(line) for line in response.data.splitlines()] == expected
+
+
+def test_snapshot_isolation(backend):
+    """
+    Snapshots ignore writes made after they were taken.
+    """
+    backend.add("skill", Skill("Python", "1-2 Years", "example-logo.png"))
+    snapshot = backend.snapshot("skill")
+    backend.add("skill", Skill("Go", "1 Year", "example-logo.png"))
+    assert [item.name for _, item in snapshot] == ["Python"]
+
+
+def test_search():
+    """
+    Search ranks matching records and follows updates and deletes.
+    """
+    client = app.test_client()
+    example_experience = {
+        "title": "Kubernetes Operator",
+        "company": "Quasar Systems",
+        "start_date": "May 2021",
+        "end_date": "Present",
+        "description": "Running kubernetes clusters, lots of kubernetes",
+        "logo": "example-logo.png",
+    }
+    item_id = client.post("/resume/experience", json=example_experience).json["id"]
+    client.post(
+        "/resume/skill",
+        json={"name": "Kubernetes", "proficiency": "1 Year", "logo": "example-logo.png"},
+    )
+
+    response = client.get("/resume/search?q=KUBERNETES quasar")
+    assert response.status_code == 200
+    assert response.json[0]["section"] == "experience"
+    assert response.json[0]["id"] == item_id
+    assert response.json[0]["item"]["company"] == "Quasar Systems"
+    assert {result["section"] for result in response.json} == {"experience", "skill"}
+
+    response = client.get("/resume/search?q=kubernetes&section=skill")
+    assert [result["section"] for result in response.json] == ["skill"]
+
+    client.put(
+        f"/resume/experience/{item_id}",
+        json={**example_experience, "company": "Nebula Labs"},
+    )
+    assert client.get("/resume/search?q=quasar").json == []
+    assert client.get("/resume/search?q=nebula").json[0]["id"] == item_id
+
+    client.delete(f"/resume/experience/{item_id}")
+    assert client.get("/resume/search?q=nebula").json == []
+
+    assert client.get("/resume/search").status_code == 400
+    assert client.get("/resume/search?q=x&section=bogus").status_code == 400
+
+
+def test_sparse_fieldsets():
+    """
+    ?fields= returns only the requested fields and rejects unknown ones.
+    """
+    client = app.test_client()
+    response = client.get("/resume/experience?fields=title,company")
+    assert response.status_code == 200
+    assert all(list(item) == ["title", "company"] for item in response.json)
+
+    item_id = client.post(
+        "/resume/skill",
+        json={"name": "Elixir", "proficiency": "1 Year", "logo": "example-logo.png"},
+    ).json["id"]
+    response = client.get(f"/resume/skill/{item_id}?fields=proficiency,name")
+    assert list(response.json.items()) == [("proficiency", "1 Year"), ("name", "Elixir")]
+
+    response = client.get("/resume/skill?fields=name&stream=1")
+    assert all(list(app.json.loads(line)) == ["name"] for line in response.data.splitlines())
+
+    response = client.get("/resume/skill?fields=name,salary")
+    assert response.status_code == 400
+    assert "salary" in response.json["error"]
+    assert client.get(f"/resume/skill/{item_id}?fields=").status_code == 400
+
+
+def test_compression():
+    """
+    Large responses are gzipped when accepted, and the compressed body is reused.
+    """
+    client = app.test_client()
+    for number in range(20):
+        client.post(
+            "/resume/skill",
+            json={"name": f"Skill {number}", "proficiency": "1 Year", "logo": "a.png"},
+        )
+    plain = client.get("/resume/skill")
+    assert "Content-Encoding" not in plain.headers
+
+    headers = {"Accept-Encoding": "gzip"}
+    response = client.get("/resume/skill", headers=headers)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers["ETag"] != plain.headers["ETag"]
+
+    again = client.get("/resume/skill", headers=headers)
+    assert again.headers["X-Cache"] == "HIT"
+    assert again.data == response.data
+
+    etag = response.headers["ETag"]
+    cached = client.get("/resume/skill", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    small = client.get("/resume/skill/0?fields=name", headers=headers)
+    assert "Content-Encoding" not in small.headers
+
+
+def test_concurrent_storage(backend):
+    """
+    Many threads add, update, delete and read at once; every reader sees a
+    consistent section and no write is lost.
+    """
+    writers, rounds = 8, 50
+    errors = []
+    done = threading.Event()
+
+    def write(number):
+        try:
+            for round_number in range(rounds):
+                name = f"{number}-{round_number}"
+                item_id = backend.add("skill", Skill(name, "new", "a.png"))
+                assert backend.update("skill", item_id, Skill(name, "updated", "a.png"))
+                if round_number % 2:
+                    assert backend.delete("skill", item_id)
+                    assert not backend.delete("skill", item_id)
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    def read():
+        try:
+            while not done.is_set():
+                pairs = list(backend.snapshot("skill"))
+                ids = [item_id for item_id, _ in pairs]
+                assert ids == sorted(set(ids))
+                page = backend.page("skill", limit=10)
+                assert [item_id for item_id, _ in page] == sorted(
+                    item_id for item_id, _ in page
+                )
+                assert len(backend.all("skill")) <= writers * rounds
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers + threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert not errors
+    names = sorted(item.name for item in backend.all("skill"))
+    assert names == sorted(
+        f"{n}-{r}" for n in range(writers) for r in range(rounds) if r % 2 == 0
+    )
+    assert all(item.proficiency == "updated" for item in backend.all("skill"))
+    assert backend.count("skill") == len(names)
+
+
+def call_asgi(method, path, body=b"", headers=(), query=b""):
+    """
+    Builds the scope, receive and send callables for one ASGI request.
+    Messages sent by the application are collected in the returned list.
+    """
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": list(headers),
+    }
+    return scope, receive, send, sent
+
+
+def test_asgi_application():
+    """
+    The ASGI variant serves the same data as the Flask app, including long polls.
+    """
+    async def request(method, path, body=b"", headers=(), query=b""):
+        scope, receive, send, sent = call_asgi(method, path, body, headers, query)
+        await application(scope, receive, send)
+        return sent[0]["status"], dict(sent[0]["headers"]), sent[1]["body"]
+
+    async def scenario():
+        example_skill = {"name": "Erlang", "proficiency": "1 Year", "logo": "a.png"}
+        status, _, body = await request(
+            "POST", "/resume/skill", app.json.dumps(example_skill).encode()
+        )
+        assert status == 201
+        item_id = app.json.loads(body)["id"]
+
+        status, _, body = await request("GET", f"/resume/skill/{item_id}")
+        assert (status, app.json.loads(body)) == (200, example_skill)
+        assert app.test_client().get(f"/resume/skill/{item_id}").json == example_skill
+
+        status, headers, body = await request("GET", "/resume/skill")
+        assert app.json.loads(body)[-1] == example_skill
+        etag = headers[b"etag"]
+        assert etag.decode() == app.test_client().get("/resume/skill").headers["ETag"]
+
+        status, _, _ = await request(
+            "GET", "/resume/skill", headers=[(b"if-none-match", etag)]
+        )
+        assert status == 304
+
+        # A long poll returns as soon as another request changes the section
+        poll = asyncio.create_task(
+            request(
+                "GET",
+                "/resume/skill",
+                headers=[(b"if-none-match", etag)],
+                query=b"wait=5",
+            )
+        )
+        await asyncio.sleep(0.05)
+        assert not poll.done()
+        await request("DELETE", f"/resume/skill/{item_id}")
+        status, _, body = await asyncio.wait_for(poll, 1)
+        assert status == 200
+        assert example_skill not in app.json.loads(body)
+
+        status, _, body = await request("POST", "/resume/skill", b'{"name": "Go"}')
+        assert status == 400
+        assert "proficiency" in app.json.loads(body)["error"]
+        assert (await request("GET", "/resume/unknown"))[0] == 404
+        assert (await request("DELETE", f"/resume/skill/{item_id}"))[0] == 404
+        assert (await request("DELETE", "/resume/experience/999"))[0] == 400
+        assert (await request("DELETE", "/resume/education/999"))[0] == 400
+        assert (await request("PUT", f"/resume/skill/{item_id}", b"{}"))[0] == 405
+        assert (await request("GET", "/resume/skill/\u00b2"))[0] == 404
+
+    asyncio.run(scenario())
+
+
+def test_compact_models():
+    """
+    Models have no per-instance dict, cannot be modified and share
+    repeated field values.
+    """
+    first = Skill("Python", "".join(["1-2 ", "Years"]), "example-logo.png")
+    second = Skill("Go", "".join(["1-2 ", "Years"]), "example-logo.png")
+    assert not hasattr(first, "__dict__")
+    assert first.proficiency is second.proficiency
+    try:
+        first.name = "Rust"
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("models should be frozen")
+
+
+def test_logo_serving():
+    """
+    Logos are served from immutable, content-hashed URLs with Range support.
+    """
+    client = app.test_client()
+    with open("example-logo.png", "rb") as logo_file:
+        content = logo_file.read()
+
+    response = client.get("/logos/example-logo.png")
+    assert response.status_code == 302
+    url = response.headers["Location"]
+    assert url == f"/logos/{hashlib.sha256(content).hexdigest()}.png"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == content
+    assert response.mimetype == "image/png"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["Content-Security-Policy"] == "default-src 'none'"
+    response.close()
+
+    response = client.get(url, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.data == content[:10]
+    response.close()
+
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.get("/logos/missing.png").status_code == 404
+    assert client.get(f"/logos/{'0' * 64}.png").status_code == 404
+
+
+def test_logo_upload():
+    """
+    Uploads are stored once per content and unreferenced blobs are collected.
+    """
+    client = app.test_client()
+    content = b"\x89PNG\r\n\x1a\n" + os.urandom(64)
+    digest = hashlib.sha256(content).hexdigest()
+
+    response = client.post("/logos", data=content, content_type="image/png")
+    assert response.status_code == 201
+    assert response.json["digest"] == digest
+    assert response.json["logo"] == f"{digest}.png"
+    assert client.get(response.json["url"]).data == content
+    assert os.stat(logo_store.path(digest, ".png")).st_mode & 0o777 == 0o644
+    again = client.post("/logos", data=content, content_type="image/png")
+    assert again.json["digest"] == digest
+
+    # A blob is only served with the type it was uploaded as
+    assert client.get(f"/logos/{digest}.svg").status_code == 404
+    script = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+    upload = client.post("/logos", data=script, content_type="image/png").json
+    assert client.get(f"/logos/{upload['digest']}.svg").status_code == 404
+
+    response = client.post("/logos", data=b"x", content_type="text/plain")
+    assert response.status_code == 415
+    too_large = b"x" * (app.config["LOGO_MAX_SIZE"] + 1)
+    response = client.post("/logos", data=too_large, content_type="image/png")
+    assert response.status_code == 413
+
+    new_skill = {"name": "Go", "proficiency": "1 Year", "logo": f"{digest}.png"}
+    item_id = client.post("/resume/skill", json=new_skill).json["id"]
+    assert digest in referenced_logos()
+    assert logo_store.collect(referenced_logos(), grace=0) >= 0
+    assert logo_store.path(digest, ".png") is not None
+    assert logo_store.names["example-logo.png"] in referenced_logos()
+
+    client.delete(f"/resume/skill/{item_id}")
+    assert logo_store.collect(referenced_logos(), grace=60) == 0
+    assert logo_store.path(digest, ".png") is not None
+    assert logo_store.collect(referenced_logos(), grace=0) >= 1
+    assert logo_store.path(digest, ".png") is None
+
+
+def test_record_validation():
+    """
+    Every POST and PUT path checks field types and lengths and reports all
+    errors at once.
+    """
+    client = app.test_client()
+    invalid_skill = {"name": 42, "logo": "x" * 501}
+    response = client.post("/resume/skill", json=invalid_skill)
+    assert response.status_code == 400
+    assert response.json["error"] == (
+        "Missing required fields: proficiency; "
+        "name must be of type str; "
+        "logo must be at most 500 characters"
+    )
+
+    valid_experience = {
+        "title": "Engineer",
+        "company": "A Cool Company",
+        "start_date": "May 2025",
+        "end_date": "Present",
+        "description": "d" * 5000,
+        "logo": "example-logo.png",
+    }
+    item_id = client.post("/resume/experience", json=valid_experience).json["id"]
+    response = client.put(
+        f"/resume/experience/{item_id}", json={**valid_experience, "end_date": None}
+    )
+    assert response.status_code == 400
+    assert "end_date must be of type str" in response.json["error"]
+
+    invalid_education = {
+        "course": ["CS"],
+        "school": "Tech",
+        "start_date": "2019",
+        "end_date": "2022",
+        "grade": "80%",
+        "logo": "example-logo.png",
+    }
+    response = client.post("/resume/education", json=invalid_education)
+    assert response.json["error"] == "course must be of type str"
+
+
+def test_metrics():
+    """
+    Requests are counted and timed per route and exposed with collection
+    sizes and cache statistics in the Prometheus text format.
+    """
+    client = app.test_client()
+    metrics.reset()
+    client.get("/resume/skill")
+    client.get("/resume/skill/does-not-exist")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert (
+        'resume_http_requests_total{method="GET",route="/resume/skill",status="200"} 1'
+        in text
+    )
+    assert 'route="unmatched",status="404"} 1' in text
+    assert "# TYPE resume_http_request_duration_seconds histogram" in text
+    assert (
+        'resume_http_request_duration_seconds_bucket'
+        '{method="GET",route="/resume/skill",le="+Inf"} 1'
+        in text
+    )
+    assert f'resume_records{{section="skill"}} {store.count("skill")}' in text
+    assert "resume_response_cache_hit_ratio " in text
+
+    app.config["METRICS_ENABLED"] = False
+    try:
+        client.get("/resume/skill")
+    finally:
+        app.config["METRICS_ENABLED"] = True
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'route="/resume/skill",status="200"} 1\n' in text
+
+    histogram = Metrics(buckets=(0.1, 1.0))
+    histogram.observe("GET", "/x", 200, 0.1)
+    histogram.observe("GET", "/x", 200, 5.0)
+    rendered = histogram.render()
+    assert 'duration_seconds_bucket{method="GET",route="/x",le="0.1"} 1' in rendered
+    assert 'duration_seconds_bucket{method="GET",route="/x",le="+Inf"} 2' in rendered
+    assert 'duration_seconds_sum{method="GET",route="/x"} 5.1' in rendered
+
+
+def test_request_profiling(monkeypatch):
+    """
+    Requests carrying the profiling header are profiled only when enabled,
+    a request that raises does not keep the profiler busy, and stack
+    samples are aggregated in the collapsed flamegraph format.
+    """
+    client = app.test_client()
+    response = client.get("/resume/skill", headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/debug/profiles").status_code == 404
+
+    app.config["PROFILING_ENABLED"] = True
+    try:
+        response = client.get("/resume/skill", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        assert "X-Profile-Id" not in client.get("/resume/skill").headers
+
+        summary = client.get("/debug/profiles").json[0]
+        assert summary["id"] == profile_id
+        assert summary["path"] == "/resume/skill"
+        report = client.get(f"/debug/profiles/{profile_id}?sort=tottime")
+        assert "function calls" in report.get_data(as_text=True)
+        raw = client.get(f"/debug/profiles/{profile_id}?format=pstats")
+        assert raw.data == profiler.get(profile_id)
+        assert client.get(f"/debug/profiles/{profile_id}?sort=x").status_code == 400
+        assert client.get("/debug/profiles/0").status_code == 404
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("boom")
+
+        endpoint = app.url_map.bind("localhost").match("/resume/skill")[0]
+        monkeypatch.setitem(app.view_functions, endpoint, fail)
+        monkeypatch.setitem(app.config, "PROPAGATE_EXCEPTIONS", True)
+        with pytest.raises(RuntimeError):
+            client.get("/resume/skill", headers={"X-Profile": "1"})
+        monkeypatch.undo()
+        assert client.get("/debug/profiles").json[0]["id"] != profile_id
+        response = client.get("/resume/skill", headers={"X-Profile": "1"})
+        assert response.headers["X-Profile-Id"] not in ("busy", profile_id)
+    finally:
+        app.config["PROFILING_ENABLED"] = False
+
+    stacks = StackSampler()
+    worker = threading.Thread(target=threading.Event().wait, args=(0.5,), name="w")
+    worker.start()
+    stacks.sample()
+    worker.join()
+    assert stacks.samples == 1
+    assert "w;threading.py:Thread._bootstrap;" in stacks.collapsed()
+    stacks.reset()
+    assert stacks.collapsed() == ""
+    assert client.get("/debug/stacks").status_code == 404
+
+
+def test_write_ahead_log(tmp_path):
+    """
+    A durable store recovers every acknowledged write from its snapshot and
+    log, drops a torn final entry and checkpoints away the replayed log.
+    """
+    directory = str(tmp_path / "wal")
+    store = DurableMemoryStorage(directory, checkpoint_interval=0)
+    first = store.add("skill", Skill("Python", "1-2 Years", "example-logo.png"))
+    second = store.add("skill", Skill("Go", "1 Year", "example-logo.png"))
+    store.update("skill", first, Skill("Rust", "2 Years", "logo.png"))
+    store.checkpoint()
+    store.delete("skill", second)
+    store.add_many("skill", [Skill(str(n), "new", "a.png") for n in range(3)])
+    expected = list(store.snapshot("skill"))
+    epoch, version = store.epoch, store.version("skill")
+    store.close()
+
+    segment = max(name for name in os.listdir(directory) if name.startswith("wal-"))
+    with open(os.path.join(directory, segment), "ab") as log:
+        log.write(b'0badc0de {"torn')
+
+    store = DurableMemoryStorage(directory, fsync="interval", checkpoint_interval=0)
+    assert list(store.snapshot("skill")) == expected
+    assert store.epoch == epoch
+    assert store.version("skill") == version
+    assert store.add("skill", Skill("C", "5 Years", "a.png")) == 5
+    store.checkpoint()
+    names = sorted(os.listdir(directory))
+    assert len([name for name in names if name.startswith("snapshot-")]) == 1
+    assert len([name for name in names if name.startswith("wal-")]) == 1
+    store.close()
+
+    store = DurableMemoryStorage(directory, checkpoint_interval=0)
+    assert store.get("skill", 5) == Skill("C", "5 Years", "a.png")
+    store.close()
+
+
+def test_replicated_storage(tmp_path):
+    """
+    Two replicas of one database, as two worker processes would hold, see
+    each other's writes and notify their listeners of them.
+    """
+    path = str(tmp_path / "resume.db")
+    first = ReplicatedStorage(path, poll_interval=0)
+    second = ReplicatedStorage(path, poll_interval=0)
+    changes = []
+    second.subscribe(lambda section, item_id, item: changes.append((item_id, item)))
+
+    item_id = first.add("skill", Skill("Python", "1-2 Years", "example-logo.png"))
+    assert second.get("skill", item_id) == Skill(
+        "Python", "1-2 Years", "example-logo.png"
+    )
+    assert second.version("skill") == first.version("skill")
+    assert second.epoch == first.epoch
+
+    assert second.update("skill", item_id, Skill("Go", "1 Year", "a.png"))
+    SQLiteStorage(path).add("skill", Skill("C", "5 Years", "a.png"))
+    assert first.delete("skill", item_id)
+    assert first.all("skill") == second.all("skill") == [Skill("C", "5 Years", "a.png")]
+    assert [change[1] for change in changes] == [
+        Skill("Python", "1-2 Years", "example-logo.png"),
+        Skill("Go", "1 Year", "a.png"),
+        Skill("C", "5 Years", "a.png"),
+        None,
+    ]
+
+    # A replica that missed trimmed log entries reloads everything
+    first.retain = 0
+    first._trimmed = 0  # pylint: disable=protected-access
+    first.add("skill", Skill("Rust", "2 Years", "a.png"))
+    assert list(second.snapshot("skill")) == list(first.snapshot("skill"))
+
+
+def test_indexes_follow_other_processes(tmp_path):
+    """
+    Indexes over an SQLite store catch up with writes made through another
+    connection to the file, as another worker process would make them.
+    """
+    path = str(tmp_path / "resume.db")
+    first = SQLiteStorage(path)
+    second = SQLiteStorage(path)
+    search_index = SearchIndex()
+    search_index.follow(first)
+    date_index = DateIndex()
+    date_index.follow(first)
+    document_renderer = DocumentRenderer()
+    document_renderer.follow(first)
+
+    first.add("skill", Skill("Python", "1-2 Years", "a.png"))
+    item_id = second.add("skill", Skill("Erlang", "1 Year", "a.png"))
+    assert [hit[2] for hit in search_index.search("erlang")] == [item_id]
+    first.add_many("skill", [Skill("Go", "1 Year", "a.png")] * 2)
+    second.delete("skill", item_id)
+    first.add("skill", Skill("Rust", "2 Years", "a.png"))
+    assert search_index.search("erlang") == []
+    assert len(search_index.search("go")) == 2
+
+    experience = Experience("Engineer", "Company", "1990", "Present", "Code", "a.png")
+    item_id = second.add("experience", experience)
+    assert date_index.query("experience", current=True) == [(1990 * 12 + 1, item_id)]
+    assert "Engineer" in document_renderer.document("md")
+    experience = Experience("Manager", "Company", "1990", "Present", "Code", "a.png")
+    second.update("experience", item_id, experience)
+    assert "Engineer" not in document_renderer.document("md")
+    assert "Manager" in document_renderer.document("html")
+
+
+def test_date_queries():
+    """
+    Experience can be sorted by date, filtered by date range and narrowed
+    to current positions, page by page.
+    """
+    client = app.test_client()
+    ids = {}
+    for start, end in [
+        ("March 1991", "1993"),
+        ("1990", "Present"),
+        ("Sep 1992", "May 1995"),
+    ]:
+        new_experience = {
+            "title": "Engineer",
+            "company": "Dated Company",
+            "start_date": start,
+            "end_date": end,
+            "description": "Writing Python Code",
+            "logo": "example-logo.png",
+        }
+        ids[start] = client.post("/resume/experience", json=new_experience).json["id"]
+
+    response = client.get("/resume/experience?sort=start_date&from=1990&to=1992")
+    assert [item["start_date"] for item in response.json] == [
+        "1990",
+        "March 1991",
+        "Sep 1992",
+    ]
+    response = client.get(
+        "/resume/experience?stream=1&sort=-start_date&from=1990&to=1992"
+    )
+    lines = response.data.splitlines()
+    assert [app.json.loads(line)["start_date"] for line in lines] == [
+        "Sep 1992",
+        "March 1991",
+        "1990",
+    ]
+    response = client.get("/resume/experience?stream=1&from=2030")
+    assert response.data == b""
+    response = client.get("/resume/experience?sort=-start_date&to=1992&limit=2")
+    assert [item["start_date"] for item in response.json] == ["Sep 1992", "March 1991"]
+    next_page = response.headers["Link"].split(";")[0].strip("<>")
+    assert client.get(next_page).json[0]["start_date"] == "1990"
+
+    response = client.get("/resume/experience?sort=end_date&from=1990&to=1995")
+    assert [item["end_date"] for item in response.json] == ["1993", "May 1995"]
+    current = client.get("/resume/experience?current=1").json
+    assert {"start_date": "1990", "end_date": "Present"}.items() <= current[0].items()
+    assert all(item["end_date"] == "Present" for item in current)
+
+    new_experience["start_date"], new_experience["end_date"] = "March 1991", "Now"
+    client.put(f"/resume/experience/{ids['March 1991']}", json=new_experience)
+    response = client.get("/resume/experience?current=1&sort=-start_date&from=1990")
+    starts = [item["start_date"] for item in response.json]
+    assert starts.index("March 1991") < starts.index("1990")
+    new_experience["end_date"] = "1993"
+    client.put(f"/resume/experience/{ids['March 1991']}", json=new_experience)
+    response = client.get("/resume/experience?current=1")
+    assert "March 1991" not in [item["start_date"] for item in response.json]
+
+    client.delete(f"/resume/experience/{ids['1990']}")
+    response = client.get("/resume/experience?from=1990&to=1990")
+    assert response.json == []
+
+    assert client.get("/resume/experience?sort=title").status_code == 400
+    assert client.get("/resume/experience?from=someday").status_code == 400
+    assert client.get("/resume/skill?sort=start_date").status_code == 400
+
+
+def test_aggregated_resume():
+    """
+    GET /resume returns every section at once, re-encodes only the section
+    that changed and honours If-None-Match.
+    """
+    client = app.test_client()
+    response = client.get("/resume")
+    assert response.status_code == 200
+    assert set(response.json) == {"experience", "education", "skill"}
+    for section in ("experience", "education", "skill"):
+        assert response.json[section] == client.get(f"/resume/{section}").json
+    etag = response.headers["ETag"]
+    assert client.get("/resume").headers["X-Cache"] == "HIT"
+    response = client.get("/resume", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    education_hits = response_cache.hits
+    client.get("/resume/education")
+    assert response_cache.hits == education_hits + 1
+
+    new_skill = {"name": "Zig", "proficiency": "1 Year", "logo": "example-logo.png"}
+    client.post("/resume/skill", json=new_skill)
+    hits = response_cache.hits
+    response = client.get("/resume", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json["skill"][-1]["name"] == "Zig"
+    # The experience and education fragments were reused from the cache
+    assert response_cache.hits == hits + 2
+
+
+def test_rendered_resume():
+    """
+    The HTML and Markdown documents follow every write, are re-rendered
+    only for the record that changed and honour If-None-Match.
+    """
+    client = app.test_client()
+    response = client.get("/resume.html")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    assert "<h2>Experience</h2>" in response.get_data(as_text=True)
+    etag = response.headers["ETag"]
+    assert client.get("/resume.html", headers={"If-None-Match": etag}).status_code == 304
+
+    new_skill = {"name": "<Elm>", "proficiency": "1 Year", "logo": "example-logo.png"}
+    item_id = client.post("/resume/skill", json=new_skill).json["id"]
+    response = client.get("/resume.html", headers={"If-None-Match": etag})
     assert response.status_code == 200
-    
-    
-    
\ No newline at end of file
+    assert "<li>&lt;Elm&gt; <small>1 Year</small></li>" in response.get_data(as_text=True)
+    markdown = client.get("/resume.md")
+    assert markdown.mimetype == "text/markdown"
+    assert "- \\<Elm\\> (1 Year)" in markdown.get_data(as_text=True)
+
+    fragments = renderer._fragments["html"]["experience"]  # pylint: disable=protected-access
+    before = dict(fragments)
+    client.delete(f"/resume/skill/{item_id}")
+    assert "Elm" not in client.get("/resume.md").get_data(as_text=True)
+    assert all(fragments[key] is before[key] for key in before)
+    assert client.get("/resume.pdf").status_code == 404
@@ -2,34 +2,197 @@
 Utility functions
 '''
 
+import base64
+import binascii
+import typing
+from dataclasses import fields
+
+from models import MODELS
+
+# Longest accepted value of a text field, in characters
+DEFAULT_MAX_LENGTH = 500
+MAX_LENGTHS = {'description': 5000}
+
+
+def compile_validator(model):
+    '''
+    Builds a validator for a model from its dataclass fields
+
+    Field names, types and length limits are worked out once here, so a
+    call only loops over precomputed tuples. Every problem with the data
+    is reported, not just the first one.
+
+    Parameters
+    ----------
+    model : type
+        The dataclass to validate data for
+
+    Returns
+    -------
+    callable
+        ``validate(data)`` returning ``(item, errors)``: the model instance
+        and an empty list if the data is valid, otherwise None and the list
+        of error messages
+    '''
+    hints = typing.get_type_hints(model)
+    checks = tuple(
+        (
+            field.name,
+            hints[field.name],
+            MAX_LENGTHS.get(field.name, DEFAULT_MAX_LENGTH) if hints[field.name] is str else None,
+        )
+        for field in fields(model)
+    )
+    names = tuple(name for name, _, _ in checks)
+
+    def validate(data):
+        if not isinstance(data, dict):
+            return None, ["Invalid data format"]
+        errors = []
+        missing = [name for name in names if name not in data]
+        if missing:
+            errors.append(f"Missing required fields: {', '.join(missing)}")
+        for name, kind, limit in checks:
+            if name not in data:
+                continue
+            value = data[name]
+            if not isinstance(value, kind):
+                errors.append(f"{name} must be of type {kind.__name__}")
+            elif limit is not None and len(value) > limit:
+                errors.append(f"{name} must be at most {limit} characters")
+        if errors:
+            return None, errors
+        return model(*[data[name] for name in names]), errors
+
+    return validate
+
+
+VALIDATORS = {section: compile_validator(model) for section, model in MODELS.items()}
+
 # Define required fields for each type
 REQUIRED_FIELDS = {
-    'experience': ['title', 'company', 'start_date', 'end_date', 'description', 'logo'],
-    'education': ['course', 'school', 'start_date', 'end_date', 'grade', 'logo'],
-    'skill': ['name', 'proficiency', 'logo']
+    section: [field.name for field in fields(model)] for section, model in MODELS.items()
 }
 
+
+def validate_record(data_type, data):
+    '''
+    Validates data for a new or replaced record and builds the record
+
+    Parameters
+    ----------
+    data_type : str
+        The type of data being validated ('experience', 'education', or 'skill')
+    data : dict
+        The data to validate
+
+    Returns
+    -------
+    tuple
+        (item, error_message) - the record and None if the data is valid,
+        otherwise None and every error found, separated by semicolons
+    '''
+    item, errors = VALIDATORS[data_type](data)
+    return item, '; '.join(errors) or None
+
+
 def validate_data(data_type, data):
     '''
-    Validates that all required fields are present in the data
-    
+    Validates that all required fields are present in the data, with the
+    right types and lengths
+
     Parameters
     ----------
     data_type : str
         The type of data being validated ('experience', 'education', or 'skill')
     data : dict
         The data to validate
-        
+
     Returns
     -------
     tuple
         (bool, str) - (is_valid, error_message)
     '''
-    if data is None:
-        return False, "Invalid data format"
-    if not isinstance(data, dict):
-        return False, "Invalid data format"
-    missing_fields = [field for field in REQUIRED_FIELDS[data_type] if field not in data]
-    if missing_fields:
-        return False, f"Missing required fields: {', '.join(missing_fields)}"
-    return True, None
+    item, error_message = validate_record(data_type, data)
+    return item is not None, error_message
+
+
+def encode_cursor(item_id):
+    '''
+    Encodes the ID of the last record on a page as an opaque cursor token
+
+    Parameters
+    ----------
+    item_id : int
+        The ID of the last record returned
+
+    Returns
+    -------
+    str
+        URL-safe cursor token
+    '''
+    return base64.urlsafe_b64encode(str(item_id).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    '''
+    Decodes a cursor token produced by ``encode_cursor``
+
+    Parameters
+    ----------
+    token : str
+        The cursor token
+
+    Returns
+    -------
+    int or None
+        The ID after which the next page starts, or None if the token is invalid
+    '''
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+def encode_sort_cursor(key, item_id):
+    '''
+    Encodes the sort key and ID of the last record on a sorted page as an
+    opaque cursor token
+
+    Parameters
+    ----------
+    key : int
+        The sort key of the last record returned
+    item_id : int
+        The ID of the last record returned
+
+    Returns
+    -------
+    str
+        URL-safe cursor token
+    '''
+    return encode_cursor(f'{key}.{item_id}')
+
+
+def decode_sort_cursor(token):
+    '''
+    Decodes a cursor token produced by ``encode_sort_cursor``
+
+    Parameters
+    ----------
+    token : str
+        The cursor token
+
+    Returns
+    -------
+    tuple or None
+        The ``(key, item_id)`` pair after which the next page starts, or None
+        if the token is invalid
+    '''
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        key, item_id = base64.urlsafe_b64decode(padded.encode()).decode().split('.')
+        return int(key), int(item_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None